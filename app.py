@@ -1,31 +1,376 @@
 from __future__ import annotations
 
+import atexit
+import bisect
+import cProfile
+import csv
+import fcntl
+import gzip
+import hashlib
+import heapq
+import io
 import json
 import os
+import pstats
 import random
-from functools import wraps
-
-from flask import Flask, request, redirect, url_for, render_template_string, session, Response
+import re
+import signal
+import sqlite3
+import struct
+import sys
+import threading
+import time
+import unicodedata
+import zipfile
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from functools import lru_cache, wraps
+
+import click
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from flask import Flask, request, redirect, url_for, session, Response, jsonify, stream_with_context, g
+from markupsafe import escape
+from werkzeug.middleware.proxy_fix import ProxyFix
 from werkzeug.security import generate_password_hash, check_password_hash
 
 app = Flask(__name__)
 app.secret_key = os.environ.get("SECRET_KEY", "dev-secret-change-me")
 
 USERS_FILE = "users.json"
+SQLITE_PATH = os.environ.get("SQLITE_PATH", "kelimeweb.db")
+CATALOG_FILE = os.environ.get("CATALOG_FILE", "kelimeler.json")
+LEVELS = ["A1", "A2", "B1", "B2", "C1", "C2"]
+# soru seçimi: "random" (varsayılan) veya "leitner" (aralıklı tekrar)
+QUIZ_SCHEDULER = os.environ.get("QUIZ_SCHEDULER", "random").lower()
+# Leitner kutusu -> bir sonraki tekrar aralığı (saniye); yanlış cevap kutu 0'a döndürür
+LEITNER_INTERVALS = [0, 86400, 3 * 86400, 7 * 86400, 14 * 86400, 30 * 86400]
+
+# worker başına kelime cache'i için yaklaşık bellek sınırı (byte)
+WORD_CACHE_MAX_BYTES = int(os.environ.get("WORD_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# journal bu boyutu aşınca snapshot'a katlanır; bu kadar saniye dokunulmayan journal da katlanır
+JOURNAL_COMPACT_BYTES = int(os.environ.get("JOURNAL_COMPACT_BYTES", str(32 * 1024)))
+JOURNAL_IDLE_SECONDS = int(os.environ.get("JOURNAL_IDLE_SECONDS", "300"))
+
+
+# ----------------- METRICS (Prometheus) -----------------
+# Her worker sayaç/histogramlarını bellekte tutar ve en fazla METRICS_FLUSH_SECONDS'ta bir
+# METRICS_DIR/worker_<pid>.json dosyasına yazar. /metrics hangi worker'a düşerse düşsün dizindeki
+# tüm dosyaları toplar: sayaç ve histogramlar (ölmüş worker'lar dahil) toplanır, gauge'lar yalnızca
+# yaşayan worker'lardan alınır. Dizin deploy başında gunicorn.conf.py (on_starting) içinde temizlenir.
+METRICS_DIR = os.environ.get("METRICS_DIR") or os.environ.get("PROMETHEUS_MULTIPROC_DIR") or "metrics"
+METRICS_FLUSH_SECONDS = float(os.environ.get("METRICS_FLUSH_SECONDS", "2"))
+# boşsa /metrics herkese açık; doluysa "Authorization: Bearer <token>" gerekir
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRIC_TYPES = {
+    "kelimeweb_http_requests_total": ("counter", "HTTP istekleri (route, method, status)"),
+    "kelimeweb_http_request_duration_seconds": ("histogram", "İstek süresi (yanıt dönene kadar)"),
+    "kelimeweb_storage_seconds": ("histogram", "Storage çağrı süresi (op, backend)"),
+    "kelimeweb_storage_bytes_total": ("counter", "Storage dosyalarından okunan/yazılan byte"),
+    "kelimeweb_template_render_seconds": ("histogram", "Şablon render süresi"),
+    "kelimeweb_password_hash_seconds": ("histogram", "Şifre hash/doğrulama süresi (kuyruk dahil)"),
+    "kelimeweb_hash_pool_rejected_total": ("counter", "Havuz dolu olduğu için reddedilen hash işleri"),
+    "kelimeweb_hash_pool_completed_total": ("counter", "Başarıyla tamamlanan hash işleri"),
+    "kelimeweb_hash_pool_timeouts_total": ("counter", "HASH_TIMEOUT içinde bitmediği için 503 dönen hash işleri"),
+    "kelimeweb_hash_pool_failed_total": ("counter", "Hata ile biten hash işleri"),
+    "kelimeweb_hash_pool_pending": ("gauge", "Hash havuzunda bekleyen/çalışan iş sayısı"),
+    "kelimeweb_write_behind_pending": ("gauge", "Diske yazılmayı bekleyen cevaplar (write-behind)"),
+    "kelimeweb_word_cache_hits_total": ("counter", "Kelime cache isabetleri"),
+    "kelimeweb_word_cache_misses_total": ("counter", "Kelime cache ıskaları"),
+    "kelimeweb_word_cache_evictions_total": ("counter", "Kelime cache'ten atılan kullanıcılar"),
+    "kelimeweb_word_cache_hit_ratio": ("gauge", "Tüm worker'lar için kelime cache isabet oranı"),
+    "kelimeweb_word_cache_entries": ("gauge", "Cache'teki kullanıcı sayısı"),
+    "kelimeweb_word_cache_bytes": ("gauge", "Cache'in yaklaşık bellek kullanımı"),
+}
+
+_metrics_lock = threading.Lock()
+_metrics_pid = os.getpid()
+_metrics_flushed = 0.0
+_counters = {}  # (name, labels) -> değer
+_histograms = {}  # (name, labels) -> [bucket sayıları..., sum, count]
+
+
+def _labels(labels) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _metrics_reset_after_fork():
+    # preload ile master'da biriken değerler fork'tan sonra worker'a kopyalanmasın
+    global _metrics_pid
+    if _metrics_pid != os.getpid():
+        _counters.clear()
+        _histograms.clear()
+        _metrics_pid = os.getpid()
+
+
+def metric_inc(name: str, value: float = 1, **labels):
+    key = (name, _labels(labels))
+    with _metrics_lock:
+        _metrics_reset_after_fork()
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def metric_observe(name: str, seconds: float, **labels):
+    key = (name, _labels(labels))
+    with _metrics_lock:
+        _metrics_reset_after_fork()
+        h = _histograms.get(key)
+        if h is None:
+            # her sınır + "+Inf" için birer sayaç, ardından _sum ve _count
+            h = _histograms[key] = [0] * (len(LATENCY_BUCKETS) + 3)
+        h[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        h[-2] += seconds
+        h[-1] += 1
+
+
+@contextmanager
+def metric_timer(name: str, **labels):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        metric_observe(name, time.perf_counter() - t0, **labels)
+
+
+def _metrics_gauges():
+    # worker'ın kendi sayaçlarından türeyen değerler; dosyaya yazılırken anlık görüntüsü alınır
+    cache = word_cache_info()
+    counters = {
+        "kelimeweb_word_cache_hits_total": cache["hits"],
+        "kelimeweb_word_cache_misses_total": cache["misses"],
+        "kelimeweb_word_cache_evictions_total": cache["evictions"],
+        "kelimeweb_hash_pool_rejected_total": hash_pool_stats["rejected"],
+        "kelimeweb_hash_pool_completed_total": hash_pool_stats["completed"],
+        "kelimeweb_hash_pool_timeouts_total": hash_pool_stats["timeouts"],
+        "kelimeweb_hash_pool_failed_total": hash_pool_stats["failed"],
+    }
+    gauges = {
+        "kelimeweb_word_cache_entries": cache["entries"],
+        "kelimeweb_word_cache_bytes": cache["bytes"],
+        "kelimeweb_hash_pool_pending": hash_pool_stats["pending"],
+        "kelimeweb_write_behind_pending": storage.pending_count() if isinstance(storage, WriteBehindStorage) else 0,
+    }
+    return counters, gauges
+
+
+def metrics_flush(force: bool = False):
+    global _metrics_flushed
+    now = time.time()
+    if not force and now - _metrics_flushed < METRICS_FLUSH_SECONDS:
+        return
+    _metrics_flushed = now
+    counters, gauges = _metrics_gauges()
+    with _metrics_lock:
+        _metrics_reset_after_fork()
+        data = {
+            "pid": os.getpid(),
+            "counters": [[n, list(map(list, l)), v] for (n, l), v in _counters.items()]
+            + [[n, [], v] for n, v in counters.items()],
+            "histograms": [[n, list(map(list, l)), list(h)] for (n, l), h in _histograms.items()],
+            "gauges": [[n, [], v] for n, v in gauges.items()],
+        }
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    path = os.path.join(METRICS_DIR, f"worker_{os.getpid()}.json")
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def metrics_collect():
+    metrics_flush(force=True)
+    counters, histograms, gauges = {}, {}, {}
+    for name in os.listdir(METRICS_DIR):
+        if not (name.startswith("worker_") and name.endswith(".json")):
+            continue
+        try:
+            with open(os.path.join(METRICS_DIR, name), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for n, l, v in data.get("counters", []):
+            key = (n, tuple(map(tuple, l)))
+            counters[key] = counters.get(key, 0) + v
+        for n, l, h in data.get("histograms", []):
+            if len(h) != len(LATENCY_BUCKETS) + 3:
+                continue  # eski biçimde yazılmış dosya
+            key = (n, tuple(map(tuple, l)))
+            acc = histograms.setdefault(key, [0] * len(h))
+            for i, v in enumerate(h):
+                acc[i] += v
+        if _pid_alive(data.get("pid", 0)):
+            for n, l, v in data.get("gauges", []):
+                key = (n, tuple(map(tuple, l)))
+                gauges[key] = gauges.get(key, 0) + v
+
+    hits = counters.get(("kelimeweb_word_cache_hits_total", ()), 0)
+    misses = counters.get(("kelimeweb_word_cache_misses_total", ()), 0)
+    gauges[("kelimeweb_word_cache_hit_ratio", ())] = hits / (hits + misses) if hits + misses else 0.0
+    return counters, histograms, gauges
+
+
+def _fmt_labels(labels, extra=()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join(
+        '%s="%s"' % (k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for k, v in pairs
+    )
+    return "{" + body + "}"
+
+
+def render_metrics() -> str:
+    counters, histograms, gauges = metrics_collect()
+    by_name = {}
+    for store in (counters, histograms, gauges):
+        for (n, l), v in store.items():
+            by_name.setdefault(n, []).append((l, v))
+
+    out = []
+    for name in sorted(by_name):
+        kind, help_text = METRIC_TYPES.get(name, ("untyped", name))
+        out.append(f"# HELP {name} {help_text}")
+        out.append(f"# TYPE {name} {kind}")
+        for labels, v in sorted(by_name[name]):
+            if kind != "histogram":
+                out.append(f"{name}{_fmt_labels(labels)} {v}")
+                continue
+            cumulative = 0
+            for le, count in zip(list(LATENCY_BUCKETS) + ["+Inf"], v[:-2]):
+                cumulative += count
+                out.append(f"{name}_bucket{_fmt_labels(labels, [('le', le)])} {cumulative}")
+            out.append(f"{name}_sum{_fmt_labels(labels)} {v[-2]}")
+            out.append(f"{name}_count{_fmt_labels(labels)} {v[-1]}")
+    return "\n".join(out) + "\n"
+
+
+@app.before_request
+def _metrics_start():
+    request.environ["kelimeweb.t0"] = time.perf_counter()
+
+
+@app.after_request
+def _metrics_finish(resp):
+    t0 = request.environ.get("kelimeweb.t0")
+    if t0 is not None:
+        route = request.url_rule.rule if request.url_rule else "<unmatched>"
+        metric_observe("kelimeweb_http_request_duration_seconds", time.perf_counter() - t0, route=route, method=request.method)
+        metric_inc("kelimeweb_http_requests_total", route=route, method=request.method, status=resp.status_code)
+        metrics_flush()
+    return resp
+
+
+@atexit.register
+def _metrics_flush_at_exit():
+    # sadece istek sunmuş (en az bir kez yazmış) süreçler; CLI komutları metrics dizini açmasın
+    if _metrics_flushed:
+        metrics_flush(force=True)
+
+
+@app.route("/metrics")
+def metrics():
+    if METRICS_TOKEN and request.headers.get("Authorization", "") != f"Bearer {METRICS_TOKEN}":
+        return Response("unauthorized\n", status=401, mimetype="text/plain")
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4; charset=utf-8")
 
 
 # ----------------- USER HELPERS -----------------
+# Worker başına kullanıcı kaydı: storage.users_version() değişmedikçe users.json tekrar okunmaz.
+# Her yazım (register/ensure_admin/silme) versiyonu değiştirdiği için diğer worker'lar da yeniden yükler.
+_user_registry = {"version": None, "users": {}}
+_user_registry_lock = threading.Lock()
+
+
+def user_registry():
+    version = storage.users_version()
+    with _user_registry_lock:
+        if version is not None and version == _user_registry["version"]:
+            return _user_registry["users"]
+    users = storage.load_users()
+    with _user_registry_lock:
+        _user_registry["version"] = version
+        _user_registry["users"] = users
+    return users
+
+
+def user_registry_invalidate():
+    with _user_registry_lock:
+        _user_registry["version"] = None
+
+
+def get_user(username: str):
+    return user_registry().get(username)
+
+
 def load_users():
+    # çağıranlar dönen sözlüğü değiştirip save_users'a verir; cache'teki kopya bozulmasın
+    return dict(user_registry())
+
+
+def save_users(users):
+    storage.save_users(users)
+    user_registry_invalidate()
+
+
+def save_user(username: str, record, overwrite: bool = True) -> bool:
+    # tek kullanıcı yazımı: eşzamanlı kayıtlar birbirinin eklediği kullanıcıyı silmez
+    # overwrite=False iken kullanıcı zaten varsa yazılmaz, False döner
+    saved = storage.save_user(username, record, overwrite)
+    user_registry_invalidate()
+    return saved
+
+
+def delete_user(username: str):
+    storage.delete_user(username)
+    user_registry_invalidate()
+    try:
+        os.remove(days_file_for(username))
+    except FileNotFoundError:
+        pass
+
+
+def _json_load_users():
     if not os.path.exists(USERS_FILE):
-        save_users({})
+        _json_save_users({})
         return {}
-    with open(USERS_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
+    with open(USERS_FILE, "rb") as f:
+        raw = f.read()
+    metric_inc("kelimeweb_storage_bytes_total", len(raw), op="read", kind="users")
+    return json.loads(raw)
 
 
-def save_users(users):
-    with open(USERS_FILE, "w", encoding="utf-8") as f:
-        json.dump(users, f, ensure_ascii=False, indent=2)
+@contextmanager
+def _json_users_locked():
+    # users.json oku-değiştir-yaz döngüleri süreçler arasında sıraya girer
+    with open(f"{USERS_FILE}.lock", "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _json_save_users(users):
+    tmp = f"{USERS_FILE}.tmp{os.getpid()}"
+    raw = json.dumps(users, ensure_ascii=False, indent=2).encode("utf-8")
+    with open(tmp, "wb") as f:
+        f.write(raw)
+    os.replace(tmp, USERS_FILE)
+    metric_inc("kelimeweb_storage_bytes_total", len(raw), op="write", kind="users")
 
 
 def current_user():
@@ -37,8 +382,15 @@ def data_file_for(username: str):
 
 
 # ----------------- BOOTSTRAP / ADMIN -----------------
+# Import sırasında bir kez çalışır. gunicorn.conf.py preload_app=True ile bu master'da olur,
+# worker'lar fork ile devralır (deploy başına bir kez). Kilit dosyası eşzamanlı başlatmaları sıraya koyar;
+# admin şifresi önce doğrulanır, sadece değiştiyse yeniden hash'lenip yazılır.
+BOOTSTRAP_LOCK_FILE = os.environ.get("BOOTSTRAP_LOCK_FILE", ".bootstrap.lock")
+STARTUP_STATS = {"seconds": 0.0, "hashes": 0, "writes": 0}
+
+
 def bootstrap_users():
-    if os.path.exists(USERS_FILE):
+    if storage.users_initialized():
         return  # dosya varsa DOKUNMA
 
     users = {
@@ -46,7 +398,9 @@ def bootstrap_users():
         "ali":   {"pw": generate_password_hash("1234"), "role": "user"},
         "ayse":  {"pw": generate_password_hash("1234"), "role": "user"},
     }
+    STARTUP_STATS["hashes"] += len(users)
     save_users(users)
+    STARTUP_STATS["writes"] += 1
 
 
 
@@ -56,15 +410,30 @@ def ensure_admin():
     if not admin_user or not admin_pass:
         return
 
-    users = load_users()
     uname = admin_user.strip().lower()
+    current = get_user(uname)
+    if current and current.get("role") == "admin":
+        STARTUP_STATS["hashes"] += 1
+        if check_password_hash(current["pw"], admin_pass):
+            return  # zaten güncel, yazma yok
 
-    users[uname] = {
-        "pw": generate_password_hash(admin_pass),
-        "role": "admin",
-    }
+    STARTUP_STATS["hashes"] += 1
+    save_user(uname, {"pw": generate_password_hash(admin_pass), "role": "admin"})  # ✅ mutlaka burada
+    STARTUP_STATS["writes"] += 1
 
-    save_users(users)  # ✅ mutlaka burada
+
+def bootstrap():
+    start = time.perf_counter()
+    with open(BOOTSTRAP_LOCK_FILE, "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            load_catalog()
+            bootstrap_users()
+            ensure_admin()
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+    STARTUP_STATS["seconds"] = time.perf_counter() - start
+    return STARTUP_STATS
 
 
 
@@ -83,8 +452,10 @@ def is_admin(username: str | None = None) -> bool:
     username = username or current_user()
     if not username:
         return False
-    users = load_users()
-    u = users.get(username, {})
+    # oturumdaki imzalı rol admin değilse kayda bakmaya gerek yok; admin ise rol hâlâ geçerli mi kontrol edilir
+    if username == current_user() and session.get("role") not in (None, "admin"):
+        return False
+    u = get_user(username) or {}
     return u.get("role") == "admin"
 
 
@@ -100,316 +471,1746 @@ def admin_required(fn):
     return wrapper
 
 
-# ----------------- WORD HELPERS (per user) -----------------
-def load_words():
-    username = current_user()
-    if not username:
-        return []
+# ----------------- PASSWORD HASHING / THROTTLING -----------------
+# scrypt (werkzeug varsayılanı) istek thread'inde değil, sınırlı bir process havuzunda çalışır.
+# Aynı anda en fazla HASH_MAX_PENDING iş bekleyebilir; fazlası HashPoolBusy (503) alır.
+# HASH_TIMEOUT'u aşan istek de HashPoolBusy alır; iş havuzda bitene kadar yerini tutmaya devam eder.
+# Havuzun önünde kullanıcı adı ve IP başına token bucket vardır. HASH_WORKERS=0 ise hash inline yapılır.
+HASH_WORKERS = int(os.environ.get("HASH_WORKERS", "2"))
+HASH_MAX_PENDING = int(os.environ.get("HASH_MAX_PENDING", "8"))
+HASH_TIMEOUT = float(os.environ.get("HASH_TIMEOUT", "10"))
+
+
+class HashPoolBusy(Exception):
+    pass
+
+
+_hash_pool = None
+_hash_pool_pid = None
+_hash_pool_lock = threading.Lock()
+_hash_slots = threading.BoundedSemaphore(max(HASH_MAX_PENDING, 1))
+hash_pool_stats = {"pending": 0, "rejected": 0, "completed": 0, "timeouts": 0, "failed": 0}
+
 
+def _get_hash_pool():
+    global _hash_pool, _hash_pool_pid
+    with _hash_pool_lock:
+        # gunicorn fork'undan sonra her worker kendi havuzunu açar
+        if _hash_pool is None or _hash_pool_pid != os.getpid():
+            _hash_pool = ProcessPoolExecutor(max_workers=HASH_WORKERS)
+            _hash_pool_pid = os.getpid()
+        return _hash_pool
+
+
+def _run_hash(fn, *args):
+    with metric_timer("kelimeweb_password_hash_seconds", op=fn.__name__):
+        return _run_hash_timed(fn, *args)
+
+
+def _run_hash_timed(fn, *args):
+    if HASH_WORKERS <= 0:
+        return fn(*args)
+    # havuz çocuğu ölürse (ör. OOM killer) executor kalıcı olarak bozulur: atılır ve bir kez yenisiyle denenir
+    for attempt in (1, 2):
+        try:
+            return _run_hash_in_pool(fn, *args)
+        except BrokenProcessPool:
+            if attempt == 2:
+                raise HashPoolBusy()
+
+
+def _run_hash_in_pool(fn, *args):
+    if not _hash_slots.acquire(blocking=False):
+        with _hash_pool_lock:
+            hash_pool_stats["rejected"] += 1
+        raise HashPoolBusy()
+    with _hash_pool_lock:
+        hash_pool_stats["pending"] += 1
+    pool = _get_hash_pool()
+    outcome = "failed"
+    try:
+        try:
+            future = pool.submit(fn, *args)
+        except BaseException:
+            _hash_job_done(None)
+            raise
+        # yer, istek beklemeyi bıraksa da iş havuzda gerçekten bitince boşalır
+        future.add_done_callback(_hash_job_done)
+        try:
+            result = future.result(timeout=HASH_TIMEOUT)
+        except FutureTimeoutError:
+            outcome = "timeouts"
+            raise HashPoolBusy()
+        outcome = "completed"
+        return result
+    except BrokenProcessPool:
+        _drop_hash_pool(pool)
+        raise
+    finally:
+        with _hash_pool_lock:
+            hash_pool_stats[outcome] += 1
+
+
+def _drop_hash_pool(pool):
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is pool:
+            _hash_pool = None
+    pool.shutdown(wait=False)
+
+
+def _hash_job_done(_future):
+    with _hash_pool_lock:
+        hash_pool_stats["pending"] -= 1
+    _hash_slots.release()
+
+
+def hash_password(password: str) -> str:
+    return _run_hash(generate_password_hash, password)
+
+
+def verify_password(pwhash: str, password: str) -> bool:
+    return _run_hash(check_password_hash, pwhash, password)
+
+
+class TokenBucket:
+    # anahtar başına `burst` jeton, dakikada `per_minute` jeton dolar (worker başına bellekte)
+    def __init__(self, per_minute: float, burst: int, max_keys: int = 10000):
+        self.rate = per_minute / 60.0
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            ok = tokens >= 1
+            self._buckets[key] = (tokens - 1 if ok else tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._prune(now)
+            return ok
+
+    def _prune(self, now: float):
+        # dolmuş kovalar varsayılan durumla aynıdır, silinebilir
+        full = [k for k, (t, last) in self._buckets.items() if t + (now - last) * self.rate >= self.burst]
+        for k in full:
+            del self._buckets[k]
+
+
+login_user_bucket = TokenBucket(
+    float(os.environ.get("LOGIN_USER_PER_MIN", "5")), int(os.environ.get("LOGIN_USER_BURST", "5"))
+)
+login_ip_bucket = TokenBucket(
+    float(os.environ.get("LOGIN_IP_PER_MIN", "30")), int(os.environ.get("LOGIN_IP_BURST", "20"))
+)
+
+# IP kovası request.remote_addr'a bakar; PaaS yönlendiricisi / reverse proxy arkasında bu proxy'nin adresidir.
+# TRUSTED_PROXIES kadar proxy'nin X-Forwarded-For / X-Forwarded-Proto başlıklarına güvenilir (PORT verilmişse
+# varsayılan 1). Doğrudan internete açık kurulumda 0 olmalı, yoksa istemci başlığı taklit edip limiti aşar.
+TRUSTED_PROXIES = int(os.environ.get("TRUSTED_PROXIES", "1" if os.environ.get("PORT") else "0"))
+if TRUSTED_PROXIES > 0:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXIES, x_proto=TRUSTED_PROXIES)
+
+
+# ----------------- SHARED CATALOG -----------------
+# kelimeler.json tüm kullanıcılar için ortak başlangıç listesidir; process başına bir kez okunur.
+# Kullanıcı dosyası sadece "overlay" tutar:
+#   - katalog kelimesi için sayaç yaması: {"ing":"apple","tr":"elma","d":1,"y":0}
+#   - kullanıcının eklediği kelime: tam kayıt {"ing","tr","level","d","y"}
+# Eski (tam liste) dosyalar da aynı kuralla birleşir; ilk yazımda seyrekleşir.
+_catalog = None
+_catalog_keys = None
+_catalog_lock = threading.Lock()
+
+
+def load_catalog():
+    global _catalog, _catalog_keys
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                # katalog yoksa her yeni kullanıcı boş kümeyle açılırdı; worker başlarken düşsün
+                try:
+                    with open(CATALOG_FILE, "r", encoding="utf-8") as f:
+                        raw = json.load(f)
+                except FileNotFoundError:
+                    raise RuntimeError(f"Kelime kataloğu bulunamadı: {CATALOG_FILE}") from None
+                if not raw:
+                    raise RuntimeError(f"Kelime kataloğu boş: {CATALOG_FILE}")
+                catalog, keys = [], {}
+                for w in raw:
+                    key = (w.get("ing", ""), w.get("tr", ""))
+                    if key in keys:
+                        continue
+                    keys[key] = len(catalog)
+                    catalog.append((sys.intern(key[0]), sys.intern(key[1]), level_name(w.get("level", "A1"))))
+                _catalog_keys = keys
+                _catalog = tuple(catalog)
+    return _catalog
+
+
+def merge_catalog(overlay):
+    catalog = load_catalog()
+    patches, extras = {}, []
+    for e in overlay:
+        key = (e.get("ing", ""), e.get("tr", ""))
+        if key in _catalog_keys and key not in patches:
+            patches[key] = e
+        elif e.get("tr"):
+            extras.append(e)
+
+    words = []
+    for ing, tr, level in catalog:
+        e = patches.get((ing, tr))
+        if e:
+            words.append(_with_schedule(Word(
+                ing,
+                _intern(e.get("tr_merged")) or tr,
+                level_name(e.get("level", level)),
+                int(e.get("d", 0)),
+                int(e.get("y", 0)),
+            ), e))
+        else:
+            words.append(Word(ing, tr, level))
+    for e in extras:
+        words.append(_with_schedule(Word(
+            _intern(e.get("ing", "")),
+            _intern(e.get("tr", "")),
+            level_name(e.get("level", "A1")),
+            int(e.get("d", 0)),
+            int(e.get("y", 0)),
+        ), e))
+    ws = WordSet(words)
+    ws.catalog_size = len(catalog)
+    return ws
+
+
+def _with_schedule(w, src):
+    # Leitner durumu sadece cevaplanmış kelimelerde tutulur
+    if src.get("box") or src.get("due"):
+        w["box"] = int(src.get("box", 0))
+        w["due"] = int(src.get("due", 0))
+    return w
+
+
+def catalog_overlay(words):
+    catalog = load_catalog()
+    # merge_catalog çıktısında ilk catalog_size kelime, kataloğun aynı sıradaki kelimesidir
+    # (anlamı birleştirilmiş olsa bile); düz listelerde (ing, tr) ile eşleşilir
+    n = getattr(words, "catalog_size", 0)
+    overlay, seen = [], set()
+    for i, w in enumerate(words):
+        d, y = int(w.get("d", 0)), int(w.get("y", 0))
+        level, tr = w.get("level", "A1"), w.get("tr", "")
+        if i < n:
+            ing, cat_tr, cat_level = catalog[i]
+            key = (ing, cat_tr)
+        else:
+            key = (w.get("ing", ""), tr)
+            if key not in _catalog_keys or key in seen:
+                overlay.append(_with_schedule({"ing": key[0], "tr": tr, "level": level, "d": d, "y": y}, w))
+                continue
+            cat_level = catalog[_catalog_keys[key]][2]
+        seen.add(key)
+        if d or y or w.get("due") or level != cat_level or tr != key[1]:
+            patch = {"ing": key[0], "tr": key[1], "d": d, "y": y}
+            if level != cat_level:
+                patch["level"] = level
+            if tr != key[1]:
+                patch["tr_merged"] = tr
+            overlay.append(_with_schedule(patch, w))
+    return overlay
+
+
+# ----------------- WORD SET -----------------
+# Bellekteki kelime bir dict değil, __slots__'lı Word kaydıdır (dict'in ~1/3'ü kadar yer tutar).
+# ing/tr sys.intern ile paylaşılır (katalog kelimeleri tüm kullanıcılarda aynı str nesnesi),
+# seviye LEVELS'teki tek bir str nesnesine indirgenir (küçük bir enum gibi).
+# Şablonlar ve eski kod için dict benzeri arayüz sunar; JSON'a sadece catalog_overlay ile (flush'ta) çevrilir.
+_LEVEL_NAMES = {lvl: lvl for lvl in LEVELS}
+
+
+def level_name(level) -> str:
+    level = (level or "A1").upper()
+    return _LEVEL_NAMES.get(level) or sys.intern(level)
+
+
+def _intern(text):
+    return sys.intern(text) if text else text
+
+
+class Word:
+    __slots__ = ("ing", "tr", "level", "d", "y", "box", "due")
+
+    def __init__(self, ing: str, tr: str, level: str = "A1", d: int = 0, y: int = 0, box=None, due=None):
+        self.ing = ing
+        self.tr = tr
+        self.level = level
+        self.d = d
+        self.y = y
+        # Leitner durumu yalnızca cevaplanmış kelimede dolu (dict'te anahtarın olmaması gibi)
+        self.box = box
+        self.due = due
+
+    def get(self, key: str, default=None):
+        value = getattr(self, key, None) if key in Word.__slots__ else None
+        return default if value is None else value
+
+    def __getitem__(self, key: str):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value):
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def keys(self):
+        return [k for k in Word.__slots__ if getattr(self, k) is not None]
+
+    def items(self):
+        return [(k, getattr(self, k)) for k in self.keys()]
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __eq__(self, other):
+        if isinstance(other, (Word, dict)):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+
+    __hash__ = object.__hash__
+
+    def __repr__(self):
+        return f"Word({self.to_dict()!r})"
+
+
+def _success_pct(w) -> int:
+    d, y = int(w.get("d", 0)), int(w.get("y", 0))
+    return int((d / (d + y)) * 100) if d + y else 0
+
+
+WORD_ORDERS = {
+    "pct": lambda w: (_success_pct(w), int(w.get("d", 0)) + int(w.get("y", 0))),
+    "wrong": lambda w: (int(w.get("y", 0)), -int(w.get("d", 0))),
+    "level": lambda w: (w.get("level", "A1").upper(), w.get("ing", "")),
+}
+
+
+# Kelime listesi + artımlı tutulan indeksler:
+#   by_level: seviye -> kelimeler (quiz havuzu, stats filtresi O(1))
+#   by_ing:   ing -> ilk kelime (cevap kontrolü O(1))
+#   heaps:    seviye -> (due, tiebreak, id) min-heap'i (Leitner seçimi O(log n)), ilk kullanımda kurulur
+#   orders:   (seviye, sıralama) -> sıralı (anahtar, sıra no) listesi (stats sayfaları), ilk kullanımda kurulur
+class WordSet:
+    __slots__ = ("words", "by_level", "by_ing", "heaps", "_heap_keys", "orders", "_pos", "catalog_size", "_search")
+
+    def __init__(self, words=()):
+        self.catalog_size = 0
+        self.words = []
+        self.by_level = {lvl: [] for lvl in LEVELS}
+        self.by_ing = {}
+        self.heaps = {}
+        self._heap_keys = {}
+        self.orders = {}
+        self._pos = {}
+        self._search = None  # ilk aramada kurulur: sıralı [(katlanmış anahtar, pos)]
+        for w in words:
+            self.append(w)
+
+    def __iter__(self):
+        return iter(self.words)
+
+    def __len__(self):
+        return len(self.words)
+
+    def __getitem__(self, i):
+        return self.words[i]
+
+    def append(self, w):
+        self._pos[id(w)] = len(self.words)
+        self.words.append(w)
+        self.by_level.setdefault(w.get("level", "A1").upper(), []).append(w)
+        self.by_ing.setdefault(w.get("ing"), w)
+        self._push(w)
+        for name, order in self._orders_for(w):
+            bisect.insort(order, (WORD_ORDERS[name[1]](w), self._pos[id(w)]))
+        if self._search is not None:
+            for key in self._search_keys(w):
+                bisect.insort(self._search, (key, self._pos[id(w)]))
+
+    def level(self, level: str):
+        return self.by_level.get(level, [])
+
+    def get(self, ing: str):
+        return self.by_ing.get(ing)
+
+    def record(self, ing: str, correct: bool, t: float | None = None):
+        w = self.by_ing.get(ing)
+        if not w:
+            return None
+        now = int(t if t is not None else time.time())
+        touched = [(order, WORD_ORDERS[name[1]]) for name, order in self._orders_for(w)]
+        pos = self._pos[id(w)]
+        for order, key in touched:
+            i = bisect.bisect_left(order, (key(w), pos))
+            if i < len(order) and order[i][1] == pos:
+                del order[i]
+        if correct:
+            w["d"] = int(w.get("d", 0)) + 1
+            w["box"] = min(int(w.get("box", 0)) + 1, len(LEITNER_INTERVALS) - 1)
+        else:
+            w["y"] = int(w.get("y", 0)) + 1
+            w["box"] = 0
+        w["due"] = now + LEITNER_INTERVALS[w["box"]]
+        self._push(w)
+        for order, key in touched:
+            bisect.insort(order, (key(w), pos))
+        return w
+
+    # --- arama (prefix index) ---
+    # ing ve her Türkçe anlam fold_answer ile katlanıp (anahtar, pos) olarak sıralı tutulur;
+    # önek araması bisect ile başlar, add/merge index'i yeniden kurmadan günceller.
+    @staticmethod
+    def _search_keys(w):
+        keys = {fold_answer(w.get("ing", ""))}
+        keys.update(fold_answer(p) for p in _split_meanings(w.get("tr", "")))
+        # çok kelimeli anlamlarda her sözcük de aranabilsin ("feneri" -> "deniz feneri")
+        keys.update(token for key in list(keys) if " " in key for token in key.split())
+        keys.discard("")
+        return keys
+
+    def _search_index(self):
+        if self._search is None:
+            self._search = sorted((key, pos) for pos, w in enumerate(self.words) for key in self._search_keys(w))
+        return self._search
+
+    def search(self, query: str, limit: int = 20, level: str | None = None):
+        q = fold_answer(query)
+        if not q:
+            return []
+        index = self._search_index()
+        i = bisect.bisect_left(index, (q, -1))
+        seen, out = set(), []
+        while i < len(index) and index[i][0].startswith(q) and len(out) < limit:
+            pos = index[i][1]
+            w = self.words[pos]
+            if pos not in seen and (not level or w.get("level", "A1").upper() == level):
+                seen.add(pos)
+                out.append(w)
+            i += 1
+        return out
+
+    def set_tr(self, w, tr: str):
+        pos = self._pos[id(w)]
+        if self._search is not None:
+            for key in self._search_keys(w):
+                i = bisect.bisect_left(self._search, (key, pos))
+                if i < len(self._search) and self._search[i] == (key, pos):
+                    del self._search[i]
+        w["tr"] = tr
+        if self._search is not None:
+            for key in self._search_keys(w):
+                bisect.insort(self._search, (key, pos))
+
+    # --- stats sıralamaları ---
+    def _orders_for(self, w):
+        if not self.orders:
+            return []
+        lvl = w.get("level", "A1").upper()
+        return [(name, order) for name, order in self.orders.items() if name[0] in (lvl, "ALL")]
+
+    def ordering(self, level: str, key: str):
+        order = self.orders.get((level, key))
+        if order is None:
+            pool = self.words if level == "ALL" else self.level(level)
+            fn = WORD_ORDERS[key]
+            order = sorted((fn(w), self._pos[id(w)]) for w in pool)
+            self.orders[(level, key)] = order
+        return order
+
+    def page(self, level: str, key: str, start: int, end: int, desc: bool = False):
+        order = self.ordering(level, key)
+        if desc:
+            n = len(order)
+            chunk = order[max(n - end, 0):n - start][::-1]
+        else:
+            chunk = order[start:end]
+        return [self.words[pos] for _, pos in chunk]
+
+    # --- Leitner kuyruğu ---
+    def _heap_entry(self, w, renew: bool = True):
+        # anahtar kelime başınadır ve tüm heap'lerde ortaktır: yeni bir heap kurmak ("*" gibi) diğer heap'lerdeki
+        # kayıtları bayatlatmaz; sadece kelime değişince (_push) yeni anahtar alınır
+        key = None if renew else self._heap_keys.get(id(w))
+        if key is None:
+            key = random.random()
+            self._heap_keys[id(w)] = key
+        return (int(w.get("due", 0)), key, id(w), w)
+
+    def _push(self, w):
+        # kurulmuş heap'lere yeni/yenilenen kaydı ekle; eski kayıt pop sırasında atlanır
+        if not self.heaps:
+            return
+        entry = self._heap_entry(w)
+        for name in (w.get("level", "A1").upper(), "*"):
+            if name in self.heaps:
+                heapq.heappush(self.heaps[name], entry)
+
+    def _heap(self, name: str):
+        heap = self.heaps.get(name)
+        if heap is None:
+            pool = self.words if name == "*" else self.level(name)
+            heap = [self._heap_entry(w, renew=False) for w in pool]
+            heapq.heapify(heap)
+            self.heaps[name] = heap
+        return heap
+
+    def _top(self, heap):
+        while heap and self._heap_keys.get(heap[0][2]) != heap[0][1]:
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def due_batch(self, level: str, n: int):
+        # vadesi en yakın n farklı kelime; heap'ten alınanlar geri konur
+        heap = self._heap(level if self.level(level) else "*")
+        taken = []
+        while len(taken) < n and self._top(heap) is not None:
+            taken.append(heapq.heappop(heap))
+        for entry in taken:
+            heapq.heappush(heap, entry)
+        return [entry[3] for entry in taken]
+
+    def next_due(self, level: str, last: str | None = None):
+        # vadesi en yakın (hiç sorulmamışlar önce) kelime; son sorulanı atla
+        heap = self._heap(level if self.level(level) else "*")
+        top = self._top(heap)
+        if top is None:
+            return None
+        if last and top[3].get("ing") == last and len(heap) > 1:
+            held = heapq.heappop(heap)
+            nxt = self._top(heap)
+            heapq.heappush(heap, held)
+            if nxt is not None:
+                return nxt[3]
+        return top[3]
+
+
+# ----------------- WORD CACHE (per worker) -----------------
+# username -> {"key": sürüm, "offset": journal byte offset, "words": merged list, "bytes": approx}
+# JSON: sürüm snapshot'ın (mtime_ns, size, inode)'u; snapshot değişmediyse diske hiç dokunmadan parse edilmiş
+# liste döner, journal büyüdüyse sadece kuyruk okunur. SQLite: sürüm kullanıcının words_version sayacıdır.
+_word_cache: OrderedDict = OrderedDict()
+_word_cache_lock = threading.Lock()
+_word_cache_bytes = 0
+word_cache_stats = {"hits": 0, "misses": 0, "evictions": 0, "tail_replays": 0}
+
+
+def _approx_words_size(words) -> int:
+    total = sys.getsizeof(words)
+    for w in words:
+        total += sys.getsizeof(w)
+        for k, v in w.items():
+            # Word'de anahtarlar slot, dict'te str; paylaşılan (intern) değerler de sayılır
+            total += sys.getsizeof(v) + (0 if isinstance(w, Word) else sys.getsizeof(k))
+    return total
+
+
+def _stat_key(st):
+    # henüz snapshot'ı olmayan (sadece katalog kullanan) kullanıcı için None
+    return (st.st_mtime_ns, st.st_size, st.st_ino) if st else None
+
+
+def _word_cache_get(username: str, key):
+    with _word_cache_lock:
+        entry = _word_cache.get(username)
+        if entry and entry["key"] == key:
+            _word_cache.move_to_end(username)
+            return entry
+        return None
+
+
+def _word_cache_put(username: str, key, words, offset: int = 0):
+    global _word_cache_bytes
+    size = _approx_words_size(words)
+    with _word_cache_lock:
+        old = _word_cache.pop(username, None)
+        if old:
+            _word_cache_bytes -= old["bytes"]
+        if size > WORD_CACHE_MAX_BYTES:
+            return
+        _word_cache[username] = {"key": key, "offset": offset, "words": words, "bytes": size}
+        _word_cache_bytes += size
+        while _word_cache_bytes > WORD_CACHE_MAX_BYTES and _word_cache:
+            _, evicted = _word_cache.popitem(last=False)
+            _word_cache_bytes -= evicted["bytes"]
+            word_cache_stats["evictions"] += 1
+
+
+def word_cache_invalidate(username: str):
+    global _word_cache_bytes
+    with _word_cache_lock:
+        old = _word_cache.pop(username, None)
+        if old:
+            _word_cache_bytes -= old["bytes"]
+
+
+def word_cache_info():
+    with _word_cache_lock:
+        lookups = word_cache_stats["hits"] + word_cache_stats["misses"]
+        return {
+            **word_cache_stats,
+            "hit_ratio": round(word_cache_stats["hits"] / lookups, 4) if lookups else 0.0,
+            "entries": len(_word_cache),
+            "bytes": _word_cache_bytes,
+            "max_bytes": WORD_CACHE_MAX_BYTES,
+        }
+
+
+# ----------------- ANSWER JOURNAL -----------------
+# Her cevap kelimeler_<user>.journal dosyasına tek satır olarak eklenir:
+#   {"ing":"apple","ok":1,"t":1700000000}
+# Snapshot (kelimeler_<user>.json) sadece compaction sırasında yeniden yazılır.
+# Okuyucular journal üzerinde LOCK_SH, yazıcılar/compactor LOCK_EX alır.
+def journal_file_for(username: str):
+    return f"kelimeler_{username}.journal"
+
+
+def _stat_or_none(path: str):
+    try:
+        return os.stat(path)
+    except FileNotFoundError:
+        return None
+
+
+@contextmanager
+def _journal_locked(username: str, exclusive: bool = True):
+    # okuma (LOCK_SH) dosya oluşturmaz: journal'ı olmayan kullanıcı için None verilir
+    if exclusive:
+        f = open(journal_file_for(username), "a+b")
+    else:
+        try:
+            f = open(journal_file_for(username), "rb")
+        except FileNotFoundError:
+            yield None
+            return
+    with f:
+        fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield f
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _read_journal(f, offset: int, until: int | None = None):
+    # yalnızca tamamlanmış satırları tüketir; yarım kalan son satır bir sonraki okumaya kalır
+    f.seek(offset)
+    data = f.read() if until is None else f.read(max(until - offset, 0))
+    end = data.rfind(b"\n") + 1
+    metric_inc("kelimeweb_storage_bytes_total", len(data), op="read", kind="journal")
+    events = []
+    for line in data[:end].splitlines():
+        try:
+            events.append(json.loads(line))
+        except ValueError:
+            continue
+    return events, offset + end
+
+
+def _apply_events(words, events):
+    for ev in events:
+        words.record(ev.get("ing"), bool(ev.get("ok")), ev.get("t"))
+
+
+def _write_snapshot(username: str, words):
     data_file = data_file_for(username)
+    tmp = f"{data_file}.tmp{os.getpid()}"
+    raw = json.dumps(catalog_overlay(words), ensure_ascii=False, indent=2).encode("utf-8")
+    with open(tmp, "wb") as f:
+        f.write(raw)
+    os.replace(tmp, data_file)
+    metric_inc("kelimeweb_storage_bytes_total", len(raw), op="write", kind="words")
+    return os.stat(data_file)
+
+
+def _read_words(username: str):
+    # snapshot + journal'ın tamamı, compaction ile yarışmamak için LOCK_SH altında
+    data_file = data_file_for(username)
+    with _journal_locked(username, exclusive=False) as jf:
+        st = _stat_or_none(data_file)
+        words = merge_catalog(_read_overlay(data_file) if st else [])
+        events, offset = _read_journal(jf, 0) if jf else ([], 0)
+    _apply_events(words, events)
+    return st, words, offset
 
-    if not os.path.exists(data_file):
-        # yeni kullanıcıya başlangıç kelimeleri
-        words = [
-            {"ing": "apple", "tr": "elma", "level": "A1", "d": 0, "y": 0},
-            {"ing": "water", "tr": "su", "level": "A1", "d": 0, "y": 0},
-            {"ing": "bread", "tr": "ekmek", "level": "A1", "d": 0, "y": 0},
-            {"ing": "milk", "tr": "süt", "level": "A1", "d": 0, "y": 0},
-            {"ing": "house", "tr": "ev", "level": "A1", "d": 0, "y": 0},
-            {"ing": "car", "tr": "araba", "level": "A1", "d": 0, "y": 0},
-            {"ing": "dog", "tr": "köpek", "level": "A1", "d": 0, "y": 0},
-            {"ing": "cat", "tr": "kedi", "level": "A1", "d": 0, "y": 0},
-            {"ing": "book", "tr": "kitap", "level": "A1", "d": 0, "y": 0},
-            {"ing": "pen", "tr": "kalem", "level": "A1", "d": 0, "y": 1},
-            {"ing": "table", "tr": "masa", "level": "A1", "d": 0, "y": 0},
-            {"ing": "chair", "tr": "sandalye", "level": "A1", "d": 0, "y": 0},
-            {"ing": "door", "tr": "kapı", "level": "A1", "d": 0, "y": 0},
-            {"ing": "window", "tr": "pencere", "level": "A1", "d": 0, "y": 0},
-            {"ing": "phone", "tr": "telefon", "level": "A1", "d": 0, "y": 0},
-            {"ing": "school", "tr": "okul", "level": "A1", "d": 0, "y": 0},
-            {"ing": "teacher", "tr": "öğretmen", "level": "A1", "d": 0, "y": 0},
-            {"ing": "student", "tr": "öğrenci", "level": "A1", "d": 0, "y": 0},
-            {"ing": "friend", "tr": "arkadaş", "level": "A1", "d": 0, "y": 0},
-            {"ing": "family", "tr": "aile", "level": "A1", "d": 0, "y": 0},
-            {"ing": "mother", "tr": "anne", "level": "A1", "d": 0, "y": 0},
-            {"ing": "father", "tr": "baba", "level": "A1", "d": 0, "y": 0},
-            {"ing": "brother", "tr": "erkek kardeş", "level": "A1", "d": 0, "y": 0},
-            {"ing": "sister", "tr": "kız kardeş", "level": "A1", "d": 0, "y": 0},
-            {"ing": "food", "tr": "yemek", "level": "A1", "d": 0, "y": 0},
-            {"ing": "drink", "tr": "içecek", "level": "A1", "d": 0, "y": 0},
-            {"ing": "city", "tr": "şehir", "level": "A1", "d": 0, "y": 0},
-            {"ing": "street", "tr": "sokak", "level": "A1", "d": 0, "y": 0},
-            {"ing": "shop", "tr": "mağaza", "level": "A1", "d": 0, "y": 0},
-            {"ing": "money", "tr": "para", "level": "A1", "d": 0, "y": 0},
-            {"ing": "time", "tr": "zaman", "level": "A1", "d": 0, "y": 0},
-            {"ing": "day", "tr": "gün", "level": "A1", "d": 0, "y": 0},
-            {"ing": "night", "tr": "gece", "level": "A1", "d": 0, "y": 0},
-            {"ing": "morning", "tr": "sabah", "level": "A1", "d": 0, "y": 0},
-            {"ing": "good", "tr": "iyi", "level": "A1", "d": 0, "y": 0},
-            {"ing": "bad", "tr": "kötü", "level": "A1", "d": 0, "y": 0},
-            {"ing": "big", "tr": "büyük", "level": "A1", "d": 0, "y": 0},
-            {"ing": "small", "tr": "küçük", "level": "A1", "d": 0, "y": 0},
-            {"ing": "new", "tr": "yeni", "level": "A1", "d": 0, "y": 0},
-            {"ing": "old", "tr": "eski", "level": "A1", "d": 0, "y": 0},
-
-            {"ing": "answer", "tr": "cevap", "level": "A2", "d": 0, "y": 0},
-            {"ing": "question", "tr": "soru", "level": "A2", "d": 0, "y": 0},
-            {"ing": "problem", "tr": "problem", "level": "A2", "d": 0, "y": 0},
-            {"ing": "idea", "tr": "fikir", "level": "A2", "d": 0, "y": 0},
-            {"ing": "job", "tr": "iş", "level": "A2", "d": 0, "y": 0},
-            {"ing": "work", "tr": "çalışmak / iş", "level": "A2", "d": 0, "y": 0},
-            {"ing": "office", "tr": "ofis", "level": "A2", "d": 0, "y": 0},
-            {"ing": "company", "tr": "şirket", "level": "A2", "d": 0, "y": 0},
-            {"ing": "meeting", "tr": "toplantı", "level": "A2", "d": 0, "y": 0},
-            {"ing": "plan", "tr": "plan", "level": "A2", "d": 0, "y": 0},
-
-            {"ing": "travel", "tr": "seyahat etmek", "level": "A2", "d": 0, "y": 0},
-            {"ing": "holiday", "tr": "tatil", "level": "A2", "d": 0, "y": 0},
-            {"ing": "ticket", "tr": "bilet", "level": "A2", "d": 0, "y": 0},
-            {"ing": "hotel", "tr": "otel", "level": "A2", "d": 0, "y": 0},
-            {"ing": "airport", "tr": "havaalanı", "level": "A2", "d": 0, "y": 0},
-            {"ing": "weather", "tr": "hava durumu", "level": "A2", "d": 0, "y": 0},
-            {"ing": "season", "tr": "mevsim", "level": "A2", "d": 0, "y": 0},
-            {"ing": "temperature", "tr": "sıcaklık", "level": "A2", "d": 0, "y": 0},
-            {"ing": "rain", "tr": "yağmur", "level": "A2", "d": 0, "y": 0},
-            {"ing": "snow", "tr": "kar", "level": "A2", "d": 0, "y": 0},
-
-            {"ing":"experience","tr":"deneyim","level":"B1","d":0,"y":0},
-  {"ing":"improve","tr":"geliştirmek","level":"B1","d":0,"y":0},
-  {"ing":"increase","tr":"artırmak","level":"B1","d":0,"y":0},
-  {"ing":"reduce","tr":"azaltmak","level":"B1","d":0,"y":0},
-  {"ing":"result","tr":"sonuç","level":"B1","d":0,"y":0},
-  {"ing":"reason","tr":"sebep","level":"B1","d":0,"y":0},
-  {"ing":"effect","tr":"etki","level":"B1","d":0,"y":0},
-  {"ing":"success","tr":"başarı","level":"B1","d":0,"y":0},
-  {"ing":"fail","tr":"başarısız olmak","level":"B1","d":0,"y":0},
-  {"ing":"goal","tr":"hedef","level":"B1","d":0,"y":0},
-
-  {"ing":"chance","tr":"şans / ihtimal","level":"B1","d":0,"y":0},
-  {"ing":"risk","tr":"risk","level":"B1","d":0,"y":0},
-  {"ing":"choice","tr":"seçim","level":"B1","d":0,"y":0},
-  {"ing":"decision","tr":"karar","level":"B1","d":0,"y":0},
-  {"ing":"opinion","tr":"fikir","level":"B1","d":0,"y":0},
-  {"ing":"agree","tr":"katılmak","level":"B1","d":0,"y":0},
-  {"ing":"disagree","tr":"katılmamak","level":"B1","d":0,"y":0},
-  {"ing":"explain","tr":"açıklamak","level":"B1","d":0,"y":0},
-  {"ing":"describe","tr":"tanımlamak","level":"B1","d":0,"y":0},
-  {"ing":"suggest","tr":"önermek","level":"B1","d":0,"y":0},
-
-  {"ing":"support","tr":"desteklemek","level":"B1","d":0,"y":0},
-  {"ing":"manage","tr":"yönetmek","level":"B1","d":0,"y":0},
-  {"ing":"control","tr":"kontrol etmek","level":"B1","d":0,"y":0},
-  {"ing":"organize","tr":"düzenlemek","level":"B1","d":0,"y":0},
-  {"ing":"prepare","tr":"hazırlamak","level":"B1","d":0,"y":0},
-  {"ing":"develop","tr":"geliştirmek","level":"B1","d":0,"y":0},
-  {"ing":"solve","tr":"çözmek","level":"B1","d":0,"y":0},
-  {"ing":"discover","tr":"keşfetmek","level":"B1","d":0,"y":0},
-  {"ing":"expect","tr":"ummak / beklemek","level":"B1","d":0,"y":0},
-  {"ing":"avoid","tr":"kaçınmak","level":"B1","d":0,"y":0},
-
-  {"ing":"compare","tr":"karşılaştırmak","level":"B1","d":0,"y":0},
-  {"ing":"depend","tr":"bağlı olmak","level":"B1","d":0,"y":0},
-  {"ing":"allow","tr":"izin vermek","level":"B1","d":0,"y":0},
-  {"ing":"refuse","tr":"reddetmek","level":"B1","d":0,"y":0},
-  {"ing":"protect","tr":"korumak","level":"B1","d":0,"y":0},
-  {"ing":"accept","tr":"kabul etmek","level":"B1","d":0,"y":0},
-  {"ing":"continue","tr":"devam etmek","level":"B1","d":0,"y":0},
-  {"ing":"quit","tr":"bırakmak","level":"B1","d":0,"y":0},
-  {"ing":"require","tr":"gerektirmek","level":"B1","d":0,"y":0},
-  {"ing":"achieve","tr":"başarmak","level":"B1","d":0,"y":0},
-
-
-
-
-
-
-  
-  {"ing":"analyze","tr":"analiz etmek","level":"B2","d":0,"y":0},
-  {"ing":"assume","tr":"varsaymak","level":"B2","d":0,"y":0},
-  {"ing":"estimate","tr":"tahmin etmek","level":"B2","d":0,"y":0},
-  {"ing":"evaluate","tr":"değerlendirmek","level":"B2","d":0,"y":0},
-  {"ing":"interpret","tr":"yorumlamak","level":"B2","d":0,"y":0},
-  {"ing":"conclude","tr":"sonuca varmak","level":"B2","d":0,"y":0},
-  {"ing":"predict","tr":"öngörmek","level":"B2","d":0,"y":0},
-  {"ing":"determine","tr":"belirlemek","level":"B2","d":0,"y":0},
-  {"ing":"identify","tr":"tanımlamak / belirlemek","level":"B2","d":0,"y":0},
-  {"ing":"recognize","tr":"fark etmek / tanımak","level":"B2","d":0,"y":0},
-
-  {"ing":"approach","tr":"yaklaşım","level":"B2","d":0,"y":0},
-  {"ing":"strategy","tr":"strateji","level":"B2","d":0,"y":0},
-  {"ing":"process","tr":"süreç","level":"B2","d":0,"y":0},
-  {"ing":"structure","tr":"yapı","level":"B2","d":0,"y":0},
-  {"ing":"method","tr":"yöntem","level":"B2","d":0,"y":0},
-  {"ing":"feature","tr":"özellik","level":"B2","d":0,"y":0},
-  {"ing":"issue","tr":"sorun / konu","level":"B2","d":0,"y":0},
-  {"ing":"challenge","tr":"zorluk","level":"B2","d":0,"y":0},
-  {"ing":"solution","tr":"çözüm","level":"B2","d":0,"y":0},
-  {"ing":"outcome","tr":"sonuç","level":"B2","d":0,"y":0},
-
-  {"ing":"requirement","tr":"gereksinim","level":"B2","d":0,"y":0},
-  {"ing":"resource","tr":"kaynak","level":"B2","d":0,"y":0},
-  {"ing":"efficiency","tr":"verimlilik","level":"B2","d":0,"y":0},
-  {"ing":"performance","tr":"performans","level":"B2","d":0,"y":0},
-  {"ing":"capacity","tr":"kapasite","level":"B2","d":0,"y":0},
-  {"ing":"impact","tr":"etki","level":"B2","d":0,"y":0},
-  {"ing":"benefit","tr":"fayda","level":"B2","d":0,"y":0},
-  {"ing":"drawback","tr":"dezavantaj","level":"B2","d":0,"y":0},
-  {"ing":"alternative","tr":"alternatif","level":"B2","d":0,"y":0},
-  {"ing":"priority","tr":"öncelik","level":"B2","d":0,"y":0},
-
-  {"ing":"maintain","tr":"sürdürmek / korumak","level":"B2","d":0,"y":0},
-  {"ing":"implement","tr":"uygulamak","level":"B2","d":0,"y":0},
-  {"ing":"optimize","tr":"optimize etmek","level":"B2","d":0,"y":0},
-  {"ing":"eliminate","tr":"ortadan kaldırmak","level":"B2","d":0,"y":0},
-  {"ing":"adapt","tr":"uyum sağlamak","level":"B2","d":0,"y":0},
-  {"ing":"monitor","tr":"izlemek","level":"B2","d":0,"y":0},
-  {"ing":"resolve","tr":"çözümlemek","level":"B2","d":0,"y":0},
-  {"ing":"justify","tr":"haklı çıkarmak","level":"B2","d":0,"y":0},
-  {"ing":"negotiate","tr":"müzakere etmek","level":"B2","d":0,"y":0},
-  {"ing":"emphasize","tr":"vurgulamak","level":"B2","d":0,"y":0},
-
-
-
-
-
-
-
-
-  
-  {"ing":"advocate","tr":"savunmak / desteklemek","level":"C1","d":0,"y":0},
-  {"ing":"allocate","tr":"tahsis etmek","level":"C1","d":0,"y":0},
-  {"ing":"anticipate","tr":"öngörmek","level":"C1","d":0,"y":0},
-  {"ing":"articulate","tr":"net ifade etmek","level":"C1","d":0,"y":0},
-  {"ing":"assess","tr":"değerlendirmek","level":"C1","d":0,"y":0},
-  {"ing":"attribute","tr":"atfetmek","level":"C1","d":0,"y":0},
-  {"ing":"coherent","tr":"tutarlı","level":"C1","d":0,"y":0},
-  {"ing":"comprehensive","tr":"kapsamlı","level":"C1","d":0,"y":0},
-  {"ing":"conceive","tr":"tasarlamak / düşünmek","level":"C1","d":0,"y":0},
-  {"ing":"constrain","tr":"kısıtlamak","level":"C1","d":0,"y":0},
-
-  {"ing":"derive","tr":"türetmek / elde etmek","level":"C1","d":0,"y":0},
-  {"ing":"diminish","tr":"azalmak / azaltmak","level":"C1","d":0,"y":0},
-  {"ing":"elaborate","tr":"detaylandırmak","level":"C1","d":0,"y":0},
-  {"ing":"empirical","tr":"deneysel","level":"C1","d":0,"y":0},
-  {"ing":"endeavor","tr":"çaba / girişim","level":"C1","d":0,"y":0},
-  {"ing":"enhance","tr":"geliştirmek","level":"C1","d":0,"y":0},
-  {"ing":"explicit","tr":"açık / net","level":"C1","d":0,"y":0},
-  {"ing":"feasible","tr":"uygulanabilir","level":"C1","d":0,"y":0},
-  {"ing":"fundamental","tr":"temel","level":"C1","d":0,"y":0},
-  {"ing":"hypothesis","tr":"hipotez","level":"C1","d":0,"y":0},
-
-  {"ing":"implicit","tr":"örtük","level":"C1","d":0,"y":0},
-  {"ing":"inevitable","tr":"kaçınılmaz","level":"C1","d":0,"y":0},
-  {"ing":"integrate","tr":"entegre etmek","level":"C1","d":0,"y":0},
-  {"ing":"justify","tr":"gerekçelendirmek","level":"C1","d":0,"y":0},
-  {"ing":"manifest","tr":"belirgin / ortaya koymak","level":"C1","d":0,"y":0},
-  {"ing":"notion","tr":"kavram","level":"C1","d":0,"y":0},
-  {"ing":"paradigm","tr":"paradigma","level":"C1","d":0,"y":0},
-  {"ing":"predominant","tr":"baskın","level":"C1","d":0,"y":0},
-  {"ing":"preliminary","tr":"ön","level":"C1","d":0,"y":0},
-  {"ing":"profound","tr":"derin","level":"C1","d":0,"y":0},
-
-  {"ing":"rationale","tr":"gerekçe","level":"C1","d":0,"y":0},
-  {"ing":"refine","tr":"iyileştirmek","level":"C1","d":0,"y":0},
-  {"ing":"reinforce","tr":"pekiştirmek","level":"C1","d":0,"y":0},
-  {"ing":"subsequent","tr":"sonraki","level":"C1","d":0,"y":0},
-  {"ing":"sufficient","tr":"yeterli","level":"C1","d":0,"y":0},
-  {"ing":"synthesize","tr":"sentezlemek","level":"C1","d":0,"y":0},
-  {"ing":"theoretical","tr":"teorik","level":"C1","d":0,"y":0},
-  {"ing":"ultimately","tr":"nihayetinde","level":"C1","d":0,"y":0},
-  {"ing":"validate","tr":"doğrulamak","level":"C1","d":0,"y":0},
-  {"ing":"whereas","tr":"oysa / -iken","level":"C1","d":0,"y":0},
-
-
-
-
-
-
-
-
-  
-  {"ing":"abide","tr":"uymak","level":"C2","d":0,"y":0},
-  {"ing":"acquiesce","tr":"sessizce kabul etmek","level":"C2","d":0,"y":0},
-  {"ing":"ameliorate","tr":"iyileştirmek","level":"C2","d":0,"y":0},
-  {"ing":"arbitrary","tr":"keyfi","level":"C2","d":0,"y":0},
-  {"ing":"assertive","tr":"iddialı / kendinden emin","level":"C2","d":0,"y":0},
-  {"ing":"belligerent","tr":"saldırgan","level":"C2","d":0,"y":0},
-  {"ing":"candor","tr":"açıklık / dürüstlük","level":"C2","d":0,"y":0},
-  {"ing":"circumvent","tr":"etrafından dolaşmak / aşmak","level":"C2","d":0,"y":0},
-  {"ing":"coerce","tr":"zorlamak","level":"C2","d":0,"y":0},
-  {"ing":"convoluted","tr":"karmaşık","level":"C2","d":0,"y":0},
-
-  {"ing":"corroborate","tr":"doğrulamak","level":"C2","d":0,"y":0},
-  {"ing":"cryptic","tr":"üstü kapalı / gizemli","level":"C2","d":0,"y":0},
-  {"ing":"detrimental","tr":"zararlı","level":"C2","d":0,"y":0},
-  {"ing":"disparity","tr":"eşitsizlik / fark","level":"C2","d":0,"y":0},
-  {"ing":"elusive","tr":"zor yakalanan","level":"C2","d":0,"y":0},
-  {"ing":"embezzle","tr":"zimmete geçirmek","level":"C2","d":0,"y":0},
-  {"ing":"exacerbate","tr":"kötüleştirmek","level":"C2","d":0,"y":0},
-  {"ing":"exemplify","tr":"örneklemek","level":"C2","d":0,"y":0},
-  {"ing":"fastidious","tr":"aşırı titiz","level":"C2","d":0,"y":0},
-  {"ing":"fortuitous","tr":"şans eseri","level":"C2","d":0,"y":0},
-
-  {"ing":"hackneyed","tr":"basmakalıp","level":"C2","d":0,"y":0},
-  {"ing":"idiosyncrasy","tr":"kendine özgü özellik","level":"C2","d":0,"y":0},
-  {"ing":"impeccable","tr":"kusursuz","level":"C2","d":0,"y":0},
-  {"ing":"incessant","tr":"aralıksız","level":"C2","d":0,"y":0},
-  {"ing":"juxtapose","tr":"yan yana koymak","level":"C2","d":0,"y":0},
-  {"ing":"lucid","tr":"açık / berrak","level":"C2","d":0,"y":0},
-  {"ing":"meticulous","tr":"çok dikkatli","level":"C2","d":0,"y":0},
-  {"ing":"nonchalant","tr":"umursamaz","level":"C2","d":0,"y":0},
-  {"ing":"obfuscate","tr":"bilerek karmaşıklaştırmak","level":"C2","d":0,"y":0},
-  {"ing":"ostentatious","tr":"gösterişli","level":"C2","d":0,"y":0},
-
-  {"ing":"pervasive","tr":"yaygın","level":"C2","d":0,"y":0},
-  {"ing":"pragmatic","tr":"pragmatik","level":"C2","d":0,"y":0},
-  {"ing":"quintessential","tr":"en tipik","level":"C2","d":0,"y":0},
-  {"ing":"resilient","tr":"dayanıklı","level":"C2","d":0,"y":0},
-  {"ing":"scrutinize","tr":"didik didik incelemek","level":"C2","d":0,"y":0},
-  {"ing":"spurious","tr":"asılsız","level":"C2","d":0,"y":0},
-  {"ing":"tenuous","tr":"zayıf / belirsiz","level":"C2","d":0,"y":0},
-  {"ing":"ubiquitous","tr":"her yerde bulunan","level":"C2","d":0,"y":0},
-  {"ing":"unwarranted","tr":"yersiz","level":"C2","d":0,"y":0},
-  {"ing":"vindicate","tr":"aklamak / haklı çıkarmak","level":"C2","d":0,"y":0},
-        ]
-        save_words(words)
-        return words
 
-    with open(data_file, "r", encoding="utf-8") as f:
-        return json.load(f)
+def _read_overlay(data_file: str):
+    with open(data_file, "rb") as f:
+        raw = f.read()
+    metric_inc("kelimeweb_storage_bytes_total", len(raw), op="read", kind="words")
+    return json.loads(raw)
+
+
+def _compact_locked(username: str, jf):
+    # çağıran LOCK_EX tutuyor olmalı
+    # snapshot cache'teki nesneden değil diskten kurulur: write-behind bekleyen cevapları cache'teki nesneye
+    # hemen uygular, onlar snapshot'a girip sonra journal'a da yazılırsa iki kez sayılırdı
+    data_file = data_file_for(username)
+    st = _stat_or_none(data_file)
+    words = merge_catalog(_read_overlay(data_file) if st else [])
+    events, _ = _read_journal(jf, 0)
+    _apply_events(words, events)
+    st = _write_snapshot(username, words)
+    jf.truncate(0)
+    _word_cache_put(username, _stat_key(st), words, 0)
+
+
+def compact_journal(username: str):
+    if not _stat_or_none(journal_file_for(username)):
+        return
+    with _journal_locked(username) as jf:
+        _compact_locked(username, jf)
+
+
+def _journal_answers(username: str, answers, applied=None):
+    # answers: [(ing, correct[, t]), ...] -> tek append (tek write çağrısı)
+    # applied: cevapların önceden uygulandığı WordSet (write-behind); cache hâlâ oysa kendi satırlarımız atlanır
+    now = int(time.time())
+    lines = "".join(
+        json.dumps({"ing": a[0], "ok": 1 if a[1] else 0, "t": a[2] if len(a) > 2 else now},
+                   ensure_ascii=False, separators=(",", ":")) + "\n"
+        for a in answers
+    )
+    if not lines:
+        return
+    with _journal_locked(username) as jf:
+        start = jf.seek(0, os.SEEK_END)
+        raw = lines.encode("utf-8")
+        jf.write(raw)
+        jf.flush()
+        metric_inc("kelimeweb_storage_bytes_total", len(raw), op="write", kind="journal")
+        end = jf.tell()
+
+        entry = _word_cache_get(username, _stat_key(_stat_or_none(data_file_for(username))))
+        if entry:
+            # başka worker'ların eklediği satırlar + bizimki, cache'e sırayla uygulanır
+            own_applied = applied is not None and entry["words"] is applied
+            events, _ = _read_journal(jf, entry["offset"], start if own_applied else None)
+            _apply_events(entry["words"], events)
+            entry["offset"] = end
+
+        if start >= JOURNAL_COMPACT_BYTES:
+            _compact_locked(username, jf)
+
+
+def compact_idle_journals():
+    now = time.time()
+    for name in os.listdir("."):
+        if not (name.startswith("kelimeler_") and name.endswith(".journal")):
+            continue
+        st = os.stat(name)
+        if st.st_size and now - st.st_mtime >= JOURNAL_IDLE_SECONDS:
+            compact_journal(name[len("kelimeler_"):-len(".journal")])
+
+
+@app.cli.command("compact-journals")
+def compact_journals_command():
+    compact_idle_journals()
+
+
+# ----------------- DAILY HISTORY -----------------
+# kelimeler_<user>.days: güne göre sıralı, sabit genişlikli ikili kayıtlar (DAY_RECORD.size = 52 byte):
+#   <gün numarası uint32> + her seviye için <doğru uint32><yanlış uint32> (LEVELS sırasıyla)
+# Cevap geldiğinde son kayıt bugünse yerinde güncellenir, değilse sona eklenir; /stats'taki 7/30/90 günlük
+# başarı ve seri hesapları bu günlük toplamlardan yapılır, ham cevaplar yeniden oynatılmaz.
+DAY_RECORD = struct.Struct("<I" + "II" * len(LEVELS))
+# gün sınırı için saat farkı (varsayılan Türkiye, UTC+3)
+DAILY_UTC_OFFSET_HOURS = int(os.environ.get("DAILY_UTC_OFFSET_HOURS", "3"))
+DAILY_WINDOWS = (7, 30, 90)
+_LEVEL_INDEX = {lvl: i for i, lvl in enumerate(LEVELS)}
+
+
+def days_file_for(username: str):
+    return f"kelimeler_{username}.days"
+
+
+def day_number(t: float | None = None) -> int:
+    return int(((t if t is not None else time.time()) + DAILY_UTC_OFFSET_HOURS * 3600) // 86400)
+
+
+def _day_buckets(answers, words=None):
+    # [(ing, ok[, t])] -> {gün: [d0, y0, d1, y1, ...]}
+    now = time.time()
+    buckets = {}
+    for a in answers:
+        w = words.get(a[0]) if words is not None else None
+        col = 2 * _LEVEL_INDEX.get((w.get("level", "A1") if w else "A1").upper(), 0) + (0 if a[1] else 1)
+        counts = buckets.setdefault(day_number(a[2] if len(a) > 2 else now), [0] * (2 * len(LEVELS)))
+        counts[col] += 1
+    return buckets
+
+
+def _merge_day(f, size: int, day: int, counts):
+    n = size // DAY_RECORD.size
+    last_day = None
+    if n:
+        f.seek((n - 1) * DAY_RECORD.size)
+        last = DAY_RECORD.unpack(f.read(DAY_RECORD.size))
+        last_day = last[0]
+    if last_day is None or day > last_day:
+        f.seek(n * DAY_RECORD.size)
+        f.write(DAY_RECORD.pack(day, *counts))
+        return size + DAY_RECORD.size
+    # bugün (veya nadiren geç gelen eski gün): kaydı bulup yerinde topla
+    lo, hi = 0, n
+    while lo < hi:
+        mid = (lo + hi) // 2
+        f.seek(mid * DAY_RECORD.size)
+        if DAY_RECORD.unpack(f.read(DAY_RECORD.size))[0] < day:
+            lo = mid + 1
+        else:
+            hi = mid
+    f.seek(lo * DAY_RECORD.size)
+    rec = DAY_RECORD.unpack(f.read(DAY_RECORD.size))
+    if rec[0] == day:
+        f.seek(lo * DAY_RECORD.size)
+        f.write(DAY_RECORD.pack(day, *(a + b for a, b in zip(rec[1:], counts))))
+        return size
+    # kayıt yok: araya eklemek için kuyruk kaydırılır (yalnızca sırası bozuk gelen cevaplarda)
+    f.seek(lo * DAY_RECORD.size)
+    tail = f.read()
+    f.seek(lo * DAY_RECORD.size)
+    f.write(DAY_RECORD.pack(day, *counts) + tail)
+    return size + DAY_RECORD.size
+
+
+def daily_record(username: str, answers, words=None):
+    buckets = _day_buckets(answers, words)
+    if not buckets:
+        return
+    # yerinde güncelleme gerektiğinden "a" değil, oluşturup okuma/yazma modunda açılır
+    fd = os.open(days_file_for(username), os.O_RDWR | os.O_CREAT, 0o644)
+    with open(fd, "r+b") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            size = os.fstat(f.fileno()).st_size
+            size -= size % DAY_RECORD.size  # yarım kalmış kayıt varsa üzerine yazılır
+            for day in sorted(buckets):
+                size = _merge_day(f, size, day, buckets[day])
+            f.truncate(size)
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def load_daily(username: str):
+    # [(gün, (d0, y0, d1, y1, ...)), ...] gün sırasıyla
+    try:
+        with open(days_file_for(username), "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return []
+    usable = len(data) - len(data) % DAY_RECORD.size
+    return [(rec[0], rec[1:]) for rec in DAY_RECORD.iter_unpack(data[:usable])]
+
+
+def daily_summary(username: str, level: str = "ALL", today: int | None = None):
+    today = day_number() if today is None else today
+    cols = range(2 * len(LEVELS)) if level not in _LEVEL_INDEX else (2 * _LEVEL_INDEX[level], 2 * _LEVEL_INDEX[level] + 1)
+    days = {}
+    for day, counts in load_daily(username):
+        d = sum(counts[c] for c in cols if c % 2 == 0)
+        y = sum(counts[c] for c in cols if c % 2 == 1)
+        if d or y:
+            days[day] = (d, y)
+
+    windows = []
+    for n in DAILY_WINDOWS:
+        d = sum(days[k][0] for k in range(today - n + 1, today + 1) if k in days)
+        y = sum(days[k][1] for k in range(today - n + 1, today + 1) if k in days)
+        windows.append({"days": n, "d": d, "y": y, "pct": int(d * 100 / (d + y)) if d + y else None})
+
+    # bugün henüz cevap yoksa seri dünden sayılır (gün bitmeden kırılmış sayılmaz)
+    streak, k = 0, today if today in days else today - 1
+    while k in days:
+        streak += 1
+        k -= 1
+    longest = run = 0
+    prev = None
+    for day in sorted(days):
+        run = run + 1 if prev is not None and day == prev + 1 else 1
+        longest = max(longest, run)
+        prev = day
+
+    span = DAILY_WINDOWS[1]
+    peak = max((sum(days.get(k, (0, 0))) for k in range(today - span + 1, today + 1)), default=0) or 1
+    bars = [
+        {"day": k, "n": sum(days.get(k, (0, 0))), "h": int(sum(days.get(k, (0, 0))) * 100 / peak)}
+        for k in range(today - span + 1, today + 1)
+    ]
+    return {"windows": windows, "streak": streak, "longest": longest, "bars": bars}
+
+
+# ----------------- WORD HELPERS (per user) -----------------
+def load_words():
+    username = current_user()
+    if not username:
+        return WordSet()
+    words = storage.load_words(username)
+    g.vocab_size = len(words)  # profil kayıtları için
+    return words
 
 
 def save_words(words):
     username = current_user()
     if not username:
         return
-    data_file = data_file_for(username)
-    with open(data_file, "w", encoding="utf-8") as f:
-        json.dump(words, f, ensure_ascii=False, indent=2)
+    storage.save_words(username, words)
+
+
+def record_answer(username: str, ing: str, correct: bool, words=None):
+    record_answers(username, [(ing, correct)], words)
+
+
+def record_answers(username: str, answers, words=None):
+    storage.record_answers(username, answers)
+    daily_record(username, answers, words)
+    analytics_record(username, answers, words)
+
+
+def _load_words_for(username: str):
+    jst = _stat_or_none(journal_file_for(username))
+    st = _stat_or_none(data_file_for(username))
+
+    # yeni kullanıcı için dosya yazılmaz; katalog + boş overlay görünümü cache'lenir
+    entry = _word_cache_get(username, _stat_key(st))
+    jsize = jst.st_size if jst else 0
+    words = None
+    if entry and jsize == entry["offset"]:
+        word_cache_stats["hits"] += 1
+        words = entry["words"]
+    elif entry and jsize > entry["offset"]:
+        # tail, paylaşılan cache girdisine uygulanır: okuma, uygulama ve offset ilerletme tek LOCK_EX altında
+        # (başka thread aynı tail'i uygulamış ya da compaction girdiyi değiştirmiş olabilir, ikisi de yeniden okunur)
+        with _journal_locked(username) as jf:
+            entry = _word_cache_get(username, _stat_key(_stat_or_none(data_file_for(username))))
+            if entry:
+                events, offset = _read_journal(jf, entry["offset"])
+                _apply_events(entry["words"], events)
+                entry["offset"] = offset
+                words = entry["words"]
+        if words is not None:
+            word_cache_stats["hits"] += 1
+            word_cache_stats["tail_replays"] += 1
+    if words is None:
+        word_cache_stats["misses"] += 1
+        st, words, offset = _read_words(username)
+        _word_cache_put(username, _stat_key(st), words, offset)
+
+    if jst and jst.st_size and time.time() - jst.st_mtime >= JOURNAL_IDLE_SECONDS:
+        compact_journal(username)
+    return words
+
+
+def _save_words_for(username: str, words):
+    # tam snapshot yazımı (add vb.); journal'daki bekleyen cevaplar önce listeye katlanır
+    with _journal_locked(username) as jf:
+        entry = _word_cache_get(username, _stat_key(_stat_or_none(data_file_for(username))))
+        if entry and entry["words"] is words:
+            events, _ = _read_journal(jf, entry["offset"])
+            _apply_events(words, events)
+        st = _write_snapshot(username, words)
+        jf.truncate(0)
+        _word_cache_put(username, _stat_key(st), words, 0)
+
+
+# ----------------- STORAGE ENGINES -----------------
+# load_users/save_users/load_words/save_words/record_answer hepsi `storage` üzerinden gider.
+# STORAGE_BACKEND=json (varsayılan: users.json + kelimeler_<user>.json/.journal)
+# STORAGE_BACKEND=sqlite (SQLITE_PATH, WAL modunda tek veritabanı)
+class JsonStorage:
+    name = "json"
+
+    def users_initialized(self) -> bool:
+        return os.path.exists(USERS_FILE)
+
+    def users_version(self):
+        # atomik replace her yazımda yeni inode/mtime üretir
+        return _stat_key(_stat_or_none(USERS_FILE))
+
+    def data_version(self) -> str:
+        h = hashlib.sha1(repr(self.users_version()).encode())
+        for name in sorted(os.listdir(".")):
+            if name.startswith("kelimeler_") and name.endswith((".json", ".journal")):
+                h.update(f"{name}{_stat_key(_stat_or_none(name))}".encode())
+        return h.hexdigest()[:16]
+
+    def words_version(self, username: str):
+        # snapshot + journal stat'ı: her cevap journal'ı büyütür, her compaction snapshot'ı değiştirir
+        return (_stat_key(_stat_or_none(data_file_for(username))), _stat_key(_stat_or_none(journal_file_for(username))))
+
+    def export_words(self, username: str):
+        # cache'i doldurmadan snapshot + journal okunur (dosyası olmayan kullanıcı = boş overlay)
+        if not _stat_or_none(data_file_for(username)) and not _stat_or_none(journal_file_for(username)):
+            return []
+        _, words, _ = _read_words(username)
+        return catalog_overlay(words)
+
+    def load_users(self):
+        return _json_load_users()
+
+    def save_users(self, users):
+        with _json_users_locked():
+            _json_save_users(users)
+
+    def save_user(self, username: str, record, overwrite: bool = True) -> bool:
+        with _json_users_locked():
+            users = self.load_users()
+            if username in users and not overwrite:
+                return False
+            users[username] = record
+            _json_save_users(users)
+        return True
+
+    def load_words(self, username: str):
+        return _load_words_for(username)
+
+    def save_words(self, username: str, words):
+        _save_words_for(username, words)
+
+    def record_answers(self, username: str, answers, applied=None):
+        _journal_answers(username, answers, applied)
+
+    def delete_user(self, username: str):
+        with _json_users_locked():
+            users = self.load_users()
+            users.pop(username, None)
+            _json_save_users(users)
+        word_cache_invalidate(username)
+        for df in (data_file_for(username), journal_file_for(username)):
+            try:
+                if os.path.exists(df):
+                    os.remove(df)
+            except Exception:
+                pass
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    pw       TEXT NOT NULL,
+    role     TEXT NOT NULL DEFAULT 'user'
+);
+CREATE TABLE IF NOT EXISTS words (
+    id    INTEGER PRIMARY KEY,
+    owner TEXT NOT NULL,
+    ing   TEXT NOT NULL,
+    tr    TEXT NOT NULL,
+    level TEXT NOT NULL DEFAULT 'A1'
+);
+CREATE INDEX IF NOT EXISTS words_owner_ing ON words(owner, ing);
+CREATE UNIQUE INDEX IF NOT EXISTS words_catalog ON words(ing, tr) WHERE owner = '';
+CREATE INDEX IF NOT EXISTS words_owner_level ON words(owner, level);
+CREATE TABLE IF NOT EXISTS progress (
+    username TEXT NOT NULL,
+    word_id  INTEGER NOT NULL REFERENCES words(id) ON DELETE CASCADE,
+    d        INTEGER NOT NULL DEFAULT 0,
+    y        INTEGER NOT NULL DEFAULT 0,
+    box      INTEGER NOT NULL DEFAULT 0,
+    due      INTEGER NOT NULL DEFAULT 0,
+    tr_merged TEXT,
+    PRIMARY KEY (username, word_id)
+) WITHOUT ROWID;
+"""
+
+
+class SqliteStorage:
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._conn().executescript(SQLITE_SCHEMA)
+        cols = {row[1] for row in self._conn().execute("PRAGMA table_info(progress)")}
+        for col, decl in (("box", "INTEGER NOT NULL DEFAULT 0"), ("due", "INTEGER NOT NULL DEFAULT 0"), ("tr_merged", "TEXT")):
+            if col not in cols:
+                self._conn().execute(f"ALTER TABLE progress ADD COLUMN {col} {decl}")
+        # ortak katalog owner='' satırları olarak bir kez eklenir; progress sadece dokunulan kelimeler için tutulur
+        with self._tx() as db:
+            db.executemany(
+                "INSERT OR IGNORE INTO words(owner, ing, tr, level) VALUES ('', ?, ?, ?)",
+                load_catalog(),
+            )
+
+    def _conn(self):
+        # fork sonrası (gunicorn) bağlantı worker'lar arasında paylaşılmasın
+        db = getattr(self._local, "db", None)
+        if db is None or self._local.pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("PRAGMA foreign_keys=ON")
+            self._local.db = db
+            self._local.pid = os.getpid()
+        return db
+
+    @contextmanager
+    def _tx(self):
+        db = self._conn()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def users_initialized(self) -> bool:
+        row = self._conn().execute("SELECT 1 FROM meta WHERE key = 'users_initialized'").fetchone()
+        return row is not None
+
+    def users_version(self):
+        row = self._conn().execute("SELECT value FROM meta WHERE key = 'users_version'").fetchone()
+        return row[0] if row else "0"
+
+    def data_version(self) -> str:
+        row = self._conn().execute(
+            "SELECT (SELECT value FROM meta WHERE key = 'users_version'), "
+            "(SELECT count(*) || ':' || max(id) FROM words), "
+            "(SELECT count(*) || ':' || total(d) || ':' || total(y) || ':' || total(due) FROM progress)"
+        ).fetchone()
+        return hashlib.sha1(repr(row).encode()).hexdigest()[:16]
+
+    def words_version(self, username: str):
+        return self._words_version(self._conn(), username)
+
+    # kullanıcı başına sürüm sayacı (meta'da "words_version:<user>"): kelimelerine/ilerlemesine yapılan her yazım
+    # artırır. Worker cache'i bu sayaçla anahtarlanır; sayaç değişmediyse WordSet yeniden kurulmaz.
+    @staticmethod
+    def _words_version(db, username: str) -> int:
+        row = db.execute("SELECT value FROM meta WHERE key = ?", (f"words_version:{username}",)).fetchone()
+        return int(row[0]) if row else 0
+
+    def _bump_words_version(self, db, username: str) -> int:
+        db.execute(
+            "INSERT INTO meta(key, value) VALUES (?, '1') "
+            "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1",
+            (f"words_version:{username}",),
+        )
+        return self._words_version(db, username)
+
+    def export_words(self, username: str):
+        return catalog_overlay(self.load_words(username))
+
+    def _bump_users_version(self, db):
+        db.execute(
+            "INSERT INTO meta(key, value) VALUES ('users_version', '1') "
+            "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+        )
+
+    def load_users(self):
+        rows = self._conn().execute("SELECT username, pw, role FROM users ORDER BY username")
+        return {u: {"pw": pw, "role": role} for u, pw, role in rows}
+
+    def save_users(self, users):
+        with self._tx() as db:
+            existing = {u for (u,) in db.execute("SELECT username FROM users")}
+            for gone in existing - set(users):
+                db.execute("DELETE FROM users WHERE username = ?", (gone,))
+            db.executemany(
+                "INSERT INTO users(username, pw, role) VALUES (?, ?, ?) "
+                "ON CONFLICT(username) DO UPDATE SET pw = excluded.pw, role = excluded.role",
+                [(u, d["pw"], d.get("role", "user")) for u, d in users.items()],
+            )
+            db.execute("INSERT OR REPLACE INTO meta(key, value) VALUES ('users_initialized', '1')")
+            self._bump_users_version(db)
+
+    def save_user(self, username: str, record, overwrite: bool = True) -> bool:
+        conflict = "DO UPDATE SET pw = excluded.pw, role = excluded.role" if overwrite else "DO NOTHING"
+        with self._tx() as db:
+            cur = db.execute(
+                f"INSERT INTO users(username, pw, role) VALUES (?, ?, ?) ON CONFLICT(username) {conflict}",
+                (username, record["pw"], record.get("role", "user")),
+            )
+            if not cur.rowcount:
+                return False
+            db.execute("INSERT OR REPLACE INTO meta(key, value) VALUES ('users_initialized', '1')")
+            self._bump_users_version(db)
+        return True
+
+    def load_words(self, username: str):
+        db = self._conn()
+        entry = _word_cache_get(username, ("sqlite", self._words_version(db, username)))
+        if entry:
+            word_cache_stats["hits"] += 1
+            return entry["words"]
+        word_cache_stats["misses"] += 1
+        # sürüm ve satırlar aynı okuma anlık görüntüsünden gelir
+        db.execute("BEGIN")
+        try:
+            version = self._words_version(db, username)
+            rows = self._word_rows(db, username)
+        finally:
+            db.execute("COMMIT")
+        words = merge_catalog([
+            {"ing": i, "tr": t, "level": lv, "d": d, "y": y, "box": box, "due": due, "tr_merged": merged}
+            for i, t, lv, d, y, box, due, merged in rows
+        ])
+        _word_cache_put(username, ("sqlite", version), words)
+        return words
+
+    @staticmethod
+    def _word_rows(db, username: str):
+        return db.execute(
+            "SELECT w.ing, w.tr, w.level, p.d, p.y, p.box, p.due, p.tr_merged FROM progress p "
+            "JOIN words w ON w.id = p.word_id WHERE p.username = ? AND w.owner = '' "
+            "UNION ALL "
+            "SELECT * FROM (SELECT w.ing, w.tr, w.level, COALESCE(p.d, 0), COALESCE(p.y, 0), "
+            "COALESCE(p.box, 0), COALESCE(p.due, 0), NULL "
+            "FROM words w LEFT JOIN progress p ON p.word_id = w.id AND p.username = ? "
+            "WHERE w.owner = ? ORDER BY w.id)",
+            (username, username, username),
+        ).fetchall()
+
+    def save_words(self, username: str, words):
+        with self._tx() as db:
+            version = self._replace_words(db, username, words)
+        _word_cache_put(username, ("sqlite", version), words)
+
+    def _replace_words(self, db, username: str, words) -> int:
+        db.execute("DELETE FROM progress WHERE username = ?", (username,))
+        db.execute("DELETE FROM words WHERE owner = ?", (username,))
+        catalog_ids = {(i, t): wid for wid, i, t in db.execute("SELECT id, ing, tr FROM words WHERE owner = ''")}
+        for e in catalog_overlay(words):
+            word_id = catalog_ids.get((e["ing"], e["tr"])) if "level" not in e else None
+            if word_id is None:
+                word_id = db.execute(
+                    "INSERT INTO words(owner, ing, tr, level) VALUES (?, ?, ?, ?)",
+                    (username, e["ing"], e["tr"], e.get("level", "A1")),
+                ).lastrowid
+            if e["d"] or e["y"] or e.get("due") or e.get("tr_merged"):
+                db.execute(
+                    "INSERT INTO progress(username, word_id, d, y, box, due, tr_merged) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (username, word_id, e["d"], e["y"], e.get("box", 0), e.get("due", 0), e.get("tr_merged")),
+                )
+        return self._bump_words_version(db, username)
+
+    def record_answers(self, username: str, answers, applied=None):
+        # cevap başına tek satırlık upsert; kelime dosyası yeniden yazılmaz (Leitner kutusu/vadesi de aynı satırda)
+        now = int(time.time())
+        with self._tx() as db:
+            before = self._words_version(db, username)
+            for ing, correct, *t in answers:
+                db.execute(self._answer_sql(correct, t[0] if t else now), (username, username, ing))
+            after = self._bump_words_version(db, username)
+        # cache'teki küme tam bu yazımdan önceki sürümdeyse yeniden kurulmaz: cevaplar ona da uygulanır
+        # (write-behind'ın zaten uyguladığı nesneye ikinci kez uygulanmaz)
+        entry = _word_cache_get(username, ("sqlite", before))
+        if entry:
+            if entry["words"] is not applied:
+                for ing, correct, *t in answers:
+                    entry["words"].record(ing, correct, t[0] if t else now)
+            entry["key"] = ("sqlite", after)
+
+    @staticmethod
+    def _answer_sql(correct: bool, now: int) -> str:
+        if correct:
+            top = len(LEITNER_INTERVALS) - 1
+            due = " ".join(f"WHEN {box} THEN {iv}" for box, iv in enumerate(LEITNER_INTERVALS))
+            insert = f"1, 0, 1, {now + LEITNER_INTERVALS[1]}"
+            update = f"d = d + 1, box = MIN(box + 1, {top}), due = {now} + CASE MIN(box + 1, {top}) {due} END"
+        else:
+            insert = f"0, 1, 0, {now}"
+            update = f"y = y + 1, box = 0, due = {now}"
+        return (
+            "INSERT INTO progress(username, word_id, d, y, box, due) "
+            f"SELECT ?, id, {insert} FROM words WHERE owner IN ('', ?) AND ing = ? ORDER BY owner <> '', id LIMIT 1 "
+            f"ON CONFLICT(username, word_id) DO UPDATE SET {update}"
+        )
+
+    def delete_user(self, username: str):
+        with self._tx() as db:
+            db.execute("DELETE FROM users WHERE username = ?", (username,))
+            self._bump_users_version(db)
+            db.execute("DELETE FROM progress WHERE username = ?", (username,))
+            db.execute("DELETE FROM words WHERE owner = ?", (username,))
+            # sayaç silinmez, artırılır: aynı adla yeniden açılan hesap eski cache girdileriyle eşleşmesin
+            self._bump_words_version(db, username)
+        word_cache_invalidate(username)
+
+
+class TimedStorage:
+    # arka uç çağrılarını süre ölçerek iletir (kelimeweb_storage_seconds{op, backend})
+    TIMED = {"load_users", "save_users", "save_user", "load_words", "save_words", "record_answers", "delete_user"}
+
+    def __init__(self, backend, name: str):
+        self.backend = backend
+        self.name = name
+
+    def __getattr__(self, attr):
+        fn = getattr(self.backend, attr)
+        if attr not in self.TIMED:
+            return fn
+
+        def timed(*args, **kwargs):
+            with metric_timer("kelimeweb_storage_seconds", op=attr, backend=self.name):
+                return fn(*args, **kwargs)
+
+        return timed
+
+
+# ----------------- WRITE-BEHIND -----------------
+# WRITE_BEHIND_SECONDS > 0 ise cevaplar istek thread'inde diske yazılmaz: kullanıcı başına bellekte biriktirilir,
+# arka plan thread'i her WRITE_BEHIND_SECONDS'ta (veya WRITE_BEHIND_MAX_DIRTY cevap birikince hemen)
+# kullanıcı başına tek journal append'i / tek SQLite transaction'ı ile yazar. Süre, kabul edilen kayıp
+# penceresidir (kill -9); normal kapanışta (atexit, gunicorn worker_exit, SIGTERM) bekleyenler yazılır.
+# Aynı worker kendi bekleyen cevaplarını hemen görür; diğer worker'lar en geç pencere sonunda görür.
+WRITE_BEHIND_SECONDS = float(os.environ.get("WRITE_BEHIND_SECONDS", "0"))
+WRITE_BEHIND_MAX_DIRTY = int(os.environ.get("WRITE_BEHIND_MAX_DIRTY", "500"))
+
+
+class WriteBehindStorage:
+    def __init__(self, backend):
+        self.backend = backend
+        self._lock = threading.Lock()
+        # username -> {"answers": [(ing, ok, t)], "applied": cevapların uygulandığı WordSet, "gen": sayaç}
+        self._pending = {}
+        # username -> flush kilidi: cevaplar _pending'den alındığı andan journal'a yazılana kadar tutulur
+        self._flush_locks = {}
+        self._dirty = 0
+        self._wake = threading.Event()
+        self._thread_pid = None
+
+    def __getattr__(self, attr):
+        return getattr(self.backend, attr)
+
+    def pending_count(self) -> int:
+        return self._dirty
+
+    def record_answers(self, username: str, answers, applied=None):
+        now = int(time.time())
+        stamped = [(ing, ok, now) for ing, ok, *_ in answers]
+        with self._lock:
+            p = self._pending.setdefault(username, {"answers": [], "applied": None, "gen": 0})
+            p["answers"].extend(stamped)
+            p["gen"] += 1
+            if p["applied"] is not None:
+                for ing, ok, t in stamped:
+                    p["applied"].record(ing, ok, t)
+            self._dirty += len(stamped)
+            dirty = self._dirty
+        self._ensure_thread()
+        if dirty >= WRITE_BEHIND_MAX_DIRTY:
+            self._wake.set()
+
+    def load_words(self, username: str):
+        words = self.backend.load_words(username)
+        with self._lock:
+            p = self._pending.get(username)
+            # cache'ten gelen aynı nesneye ikinci kez uygulanmaz; yeni nesneye (SQLite, cache yenilenmesi) uygulanır
+            if p and p["applied"] is not words:
+                for ing, ok, t in p["answers"]:
+                    words.record(ing, ok, t)
+                p["applied"] = words
+        return words
+
+    def save_words(self, username: str, words):
+        # snapshot `words`'ten yazılır: bekleyen cevaplar önce journal'a gider ve yazım bitene kadar bu nesneye
+        # yeni cevap uygulanmaz (uygulansaydı hem snapshot'a hem sonraki flush ile journal'a girerdi)
+        # süren bir flush varsa önce onun journal'a yazması beklenir (yoksa aynı cevaplar snapshot'a da girer)
+        with self._flush_lock(username), self._lock:
+            p = self._take(username)
+            if p:
+                try:
+                    self.backend.record_answers(username, p["answers"], applied=p["applied"])
+                except Exception:
+                    self._restore(username, p)
+                    raise
+            self.backend.save_words(username, words)
+
+    def export_words(self, username: str):
+        self.flush_user(username)
+        return self.backend.export_words(username)
+
+    def words_version(self, username: str):
+        p = self._pending.get(username)
+        return self.backend.words_version(username), p["gen"] if p else 0
+
+    def data_version(self) -> str:
+        self.flush_all()
+        return self.backend.data_version()
+
+    def delete_user(self, username: str):
+        with self._lock:
+            self._take(username)
+        self.backend.delete_user(username)
+
+    def _flush_lock(self, username: str):
+        # kilit sırası: önce kullanıcının flush kilidi, sonra _lock
+        with self._lock:
+            return self._flush_locks.setdefault(username, threading.Lock())
+
+    def _take(self, username: str):
+        # çağıran _lock tutuyor olmalı
+        p = self._pending.pop(username, None)
+        if p:
+            self._dirty -= len(p["answers"])
+        return p
+
+    def _restore(self, username: str, p):
+        # çağıran _lock tutuyor olmalı; yazılamayan cevaplar kaybolmasın, bir sonraki turda tekrar denenir
+        cur = self._pending.setdefault(username, {"answers": [], "applied": p["applied"], "gen": p["gen"]})
+        cur["answers"][:0] = p["answers"]
+        self._dirty += len(p["answers"])
+
+    def flush_user(self, username: str):
+        with self._flush_lock(username):
+            with self._lock:
+                p = self._take(username)
+            if not p:
+                return
+            try:
+                self.backend.record_answers(username, p["answers"], applied=p["applied"])
+            except Exception:
+                with self._lock:
+                    self._restore(username, p)
+                raise
+
+    def flush_all(self):
+        for username in list(self._pending):
+            try:
+                self.flush_user(username)
+            except Exception:
+                app.logger.exception("write-behind flush failed for %s", username)
+
+    def _ensure_thread(self):
+        # gunicorn fork'undan sonra thread'ler taşınmaz; her worker kendi flusher'ını başlatır
+        if self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+        threading.Thread(target=self._run, name="write-behind", daemon=True).start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(WRITE_BEHIND_SECONDS)
+            self._wake.clear()
+            self.flush_all()
+
+
+def flush_write_behind():
+    if isinstance(storage, WriteBehindStorage):
+        storage.flush_all()
+
+
+atexit.register(flush_write_behind)
+
+
+def make_storage():
+    backend = os.environ.get("STORAGE_BACKEND", "json").lower()
+    if backend == "sqlite":
+        timed = TimedStorage(SqliteStorage(SQLITE_PATH), "sqlite")
+    else:
+        timed = TimedStorage(JsonStorage(), "json")
+    # flush'lar TimedStorage üzerinden gider: kelimeweb_storage_seconds{op="record_answers"} gerçek yazımı ölçer
+    return WriteBehindStorage(timed) if WRITE_BEHIND_SECONDS > 0 else timed
+
+
+storage = make_storage()
+
+
+@app.cli.command("migrate-sqlite")
+@click.option("--db", "db_path", default=SQLITE_PATH, show_default=True)
+def migrate_sqlite_command(db_path):
+    # users.json + kelimeler_*.json/.journal -> SQLite
+    # henüz compaction görmemiş kullanıcının sadece .journal'ı vardır; ikisinin birleşimi taşınır
+    src = JsonStorage()
+    dst = SqliteStorage(db_path)
+    users = src.load_users()
+    dst.save_users(users)
+    usernames = set()
+    for name in os.listdir("."):
+        for ext in (".json", ".journal"):
+            if name.startswith("kelimeler_") and name.endswith(ext):
+                usernames.add(name[len("kelimeler_"):-len(ext)])
+    with dst._tx() as db:
+        for username in sorted(usernames):
+            words = src.load_words(username)
+            dst._replace_words(db, username, words)
+            click.echo(f"{username}: {len(words)} kelime")
+    click.echo(f"{len(users)} kullanıcı -> {db_path}")
 
 
 def pick_word(words, last=None):
-    pool = words if not last else [w for w in words if w["ing"] != last] or words
-    word = random.choice(pool)
+    # havuzu kopyalamadan: son sorulan denk gelirse geri kalanlardan eşit olasılıkla seç
+    if not words:
+        return None, None, None, None  # kullanıcı tüm kelimelerini silmiş olabilir
+    i = random.randrange(len(words))
+    if last and len(words) > 1 and words[i]["ing"] == last:
+        i = (i + random.randrange(1, len(words))) % len(words)
+    return _question_for(words[i])
+
+
+def pick_questions(all_words, level: str, n: int):
+    pool = all_words.level(level) or all_words.words
+    if QUIZ_SCHEDULER == "leitner":
+        words = all_words.due_batch(level, n)
+    else:
+        words = random.sample(pool, min(n, len(pool)))
+    return [_question_for(w) for w in words]
+
+
+def check_answer(user_answer: str, correct_answer: str) -> bool:
+    guess = fold_answer(user_answer)
+    if not guess:
+        return False
+    variants = answer_variants(correct_answer)
+    if guess in variants:
+        return True
+    limit = _typo_limit(len(guess))
+    return limit > 0 and any(_within_distance(guess, v, limit) for v in variants)
+
+
+# ----------------- ANSWER MATCHING -----------------
+# Beklenen cevap bir kez varyant kümesine çevrilir: "/" ile ayrılmış her anlam, parantezli kısım atılmış hali,
+# Türkçe i/İ/ı katlaması ve aksansız biçim ("şans / ihtimal" -> {"sans / ihtimal", "sans", "ihtimal"}).
+# Önce küme içinde tam eşleşme aranır, yoksa uzunluğa göre sınırlı edit distance (1-2 harf hata) denenir.
+# Puanlama bilette gelen cevap metniyle yapıldığı için küme cevap metnine göre worker başına cache'lenir.
+ANSWER_VARIANT_CACHE = int(os.environ.get("ANSWER_VARIANT_CACHE", "20000"))
+# bu uzunluktan kısa cevaplarda harf hatası kabul edilmez; uzunlarda en fazla 2
+ANSWER_TYPO_MIN_LEN = int(os.environ.get("ANSWER_TYPO_MIN_LEN", "4"))
+
+_TR_UPPER = str.maketrans({"İ": "i", "I": "ı"})
+_ASCII_FOLD = str.maketrans({"ı": "i", "ç": "c", "ğ": "g", "ö": "o", "ş": "s", "ü": "u", "â": "a", "î": "i", "û": "u"})
+
+
+def fold_answer(text: str) -> str:
+    # Türkçe küçük harf (İ->i, I->ı), sonra aksan/noktalı harfler düz ASCII'ye
+    text = (text or "").translate(_TR_UPPER).casefold().translate(_ASCII_FOLD)
+    if not text.isascii():
+        text = "".join(ch for ch in unicodedata.normalize("NFKD", text) if not unicodedata.combining(ch))
+    return " ".join(text.replace("’", "'").strip(" .!?;,").split())
+
+
+@lru_cache(maxsize=ANSWER_VARIANT_CACHE)
+def answer_variants(correct_answer: str) -> frozenset:
+    forms = {correct_answer or ""}
+    for part in _split_meanings(correct_answer):
+        forms.add(part)
+        # "(to) run" -> hem "run" hem "to run" kabul
+        forms.add(re.sub(r"\([^)]*\)", " ", part))
+        forms.add(part.replace("(", " ").replace(")", " "))
+    return frozenset(f for f in map(fold_answer, forms) if f)
+
+
+def _typo_limit(n: int) -> int:
+    if n < ANSWER_TYPO_MIN_LEN:
+        return 0
+    return 1 if n < 8 else 2
+
+
+def _within_distance(a: str, b: str, limit: int) -> bool:
+    # Damerau-Levenshtein (yer değiştiren iki harf = 1 hata); satır minimumu sınırı aşınca erken çıkar
+    if abs(len(a) - len(b)) > limit:
+        return False
+    before, prev = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            d = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+            if before and i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                d = min(d, before[j - 2] + 1)
+            cur.append(d)
+        if min(cur) > limit:
+            return False
+        before, prev = prev, cur
+    return prev[-1] <= limit
+
+
+def pick_due_word(all_words, level: str, last=None):
+    word = all_words.next_due(level, last)
+    return _question_for(word) if word is not None else (None, None, None, None)
+
+
+def _question_for(word):
     direction = random.choice(["EN_TR", "TR_EN"])
     answer = word["tr"] if direction == "EN_TR" else word["ing"]
     question = f"{word['ing']} → Türkçe?" if direction == "EN_TR" else f"{word['tr']} → İngilizce?"
     return word, direction, question, answer
 
 
+# ----------------- QUESTION TICKETS -----------------
+# Soru, app.secret_key ile imzalı kısa bir biletle gelir: [ing, yön, beklenen cevap, seviye, sıra] + veriliş zamanı.
+# Salt kullanıcı adını içerir (başka kullanıcının bileti geçmez); istemci beklenen cevabı değiştiremez.
+# Sıra, bilet verildiğinde kelimenin toplam cevap sayısıdır (d + y): cevap kaydedilince artar, böylece
+# aynı bilet ikinci kez puanlanmaz. Bilet imzalıdır ama şifreli değildir: içerik okunabilir.
+QUIZ_TICKET_MAX_AGE = int(os.environ.get("QUIZ_TICKET_MAX_AGE", str(24 * 3600)))
+
+
+def _ticket_serializer(username: str):
+    return URLSafeTimedSerializer(app.secret_key, salt=f"quiz-ticket:{username}")
+
+
+def _answer_seq(word) -> int:
+    return int(word.get("d", 0)) + int(word.get("y", 0))
+
+
+def issue_ticket(username: str, word, direction: str, answer: str) -> str:
+    return _ticket_serializer(username).dumps(
+        [word["ing"], direction, answer, word.get("level", "A1"), _answer_seq(word)]
+    )
+
+
+def read_ticket(username: str, ticket: str):
+    if not ticket:
+        return None
+    try:
+        ing, direction, answer, level, seq = _ticket_serializer(username).loads(ticket, max_age=QUIZ_TICKET_MAX_AGE)
+    except (BadSignature, ValueError, TypeError):
+        return None  # süresi dolmuş (SignatureExpired), değiştirilmiş veya bozuk
+    return {"ing": ing, "direction": direction, "answer": answer, "level": level, "seq": seq}
+
+
+def ticket_unused(ticket, words) -> bool:
+    # bilet verildikten sonra kelimeye cevap kaydedildiyse (aynı bilet ya da sonraki biri) kullanılmıştır
+    w = words.get(ticket["ing"])
+    return w is not None and _answer_seq(w) == ticket["seq"]
+
+
+# ----------------- STATIC ASSETS / HTTP CACHING -----------------
+# Ortak CSS şablonlara gömülmez; içeriğinin hash'iyle adlandırılmış /assets/<ad>.<hash>.css olarak sunulur
+# ve tarayıcı bir yıl saklar (içerik değişirse URL de değişir).
+# HTML/JSON/CSS yanıtları GZIP_MIN_BYTES'tan büyükse gzip'lenir; /stats gibi akışlı yanıtlar parça parça sıkıştırılır.
+# ETag'ler veri sürümünden türetilir: değişmemiş sayfa render edilmeden 304 döner.
+GZIP_MIN_BYTES = int(os.environ.get("GZIP_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.environ.get("GZIP_LEVEL", "6"))
+GZIP_MIMETYPES = {"text/html", "text/css", "text/plain", "application/json"}
+ASSET_MAX_AGE = 365 * 24 * 3600
+ASSETS = {}  # ad -> (içerik bytes, parmak izi)
+
+
+def register_asset(name: str, source: str):
+    data = source.encode("utf-8")
+    ASSETS[name] = (data, hashlib.sha1(data).hexdigest()[:10])
+
+
+def asset_url(name: str) -> str:
+    stem, ext = os.path.splitext(name)
+    return f"/assets/{stem}.{ASSETS[name][1]}{ext}"
+
+
+app.jinja_env.globals["asset_url"] = asset_url
+
+
+@app.route("/assets/<filename>")
+def asset(filename):
+    stem, _, rest = filename.partition(".")
+    fingerprint, _, ext = rest.rpartition(".")
+    entry = ASSETS.get(f"{stem}.{ext}")
+    if not entry:
+        return "Not found", 404
+    data, current = entry
+    resp = Response(data, mimetype="text/css")
+    resp.set_etag(current)
+    if fingerprint == current:
+        resp.headers["Cache-Control"] = f"public, max-age={ASSET_MAX_AGE}, immutable"
+    else:
+        # eski parmak izi: içerik güncel ama uzun süre saklanmasın
+        resp.headers["Cache-Control"] = "no-cache"
+    return resp.make_conditional(request)
+
+
+def data_etag(*parts) -> str:
+    # şablon/CSS değişince de ETag değişsin diye asset parmak izleri dahil edilir
+    h = hashlib.sha1(repr(parts).encode("utf-8"))
+    for _, fingerprint in sorted(ASSETS.values(), key=lambda e: e[1]):
+        h.update(fingerprint.encode())
+    return h.hexdigest()[:20]
+
+
+def not_modified(etag: str):
+    if etag in request.if_none_match or request.if_none_match.contains_weak(etag):
+        resp = Response(status=304)
+        resp.set_etag(etag, weak=True)
+        resp.headers["Cache-Control"] = "private, no-cache"
+        return resp
+    return None
+
+
+def with_etag(resp, etag: str):
+    resp.set_etag(etag, weak=True)
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return resp
+
+
+def _gzip_stream(chunks):
+    z = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            out = z.compress(chunk)
+            if out:
+                yield out
+            # her parça hemen gönderilsin (akış davranışı korunur)
+            yield z.flush(zlib.Z_SYNC_FLUSH)
+        yield z.flush()
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+
+
+@app.after_request
+def _gzip_response(resp):
+    if (
+        resp.status_code != 200
+        or resp.direct_passthrough
+        or resp.mimetype not in GZIP_MIMETYPES
+        or "Content-Encoding" in resp.headers
+        or "Content-Range" in resp.headers
+        or "gzip" not in request.accept_encodings
+    ):
+        return resp
+    resp.vary.add("Accept-Encoding")
+    if resp.is_streamed:
+        resp.response = _gzip_stream(resp.response)
+        resp.headers.pop("Content-Length", None)
+    else:
+        data = resp.get_data()
+        if len(data) < GZIP_MIN_BYTES:
+            return resp
+        resp.set_data(gzip.compress(data, GZIP_LEVEL))
+    resp.headers["Content-Encoding"] = "gzip"
+    return resp
+
+
 # ----------------- AUTH HTML -----------------
-LOGIN_HTML = """
-<!doctype html><html lang="tr"><head>
-<meta charset="utf-8"><meta name="viewport" content="width=device-width,initial-scale=1">
-<title>Giriş</title>
-<style>
+AUTH_CSS = """
 body{font-family:system-ui;background:#0b1220;color:#eaf0ff;display:flex;min-height:100vh;align-items:center;justify-content:center;padding:24px}
 .card{width:min(420px,100%);background:rgba(255,255,255,.06);border:1px solid rgba(255,255,255,.1);border-radius:18px;padding:18px}
 input{width:100%;padding:12px 14px;border-radius:14px;border:1px solid rgba(255,255,255,.12);background:rgba(0,0,0,.2);color:#eaf0ff;margin-top:10px}
 button{width:100%;padding:12px 14px;border-radius:14px;border:none;margin-top:12px;font-weight:700;background:linear-gradient(135deg, rgba(110,231,255,.95), rgba(167,139,250,.95));color:#07111f}
 a{color:#6ee7ff;text-decoration:none;font-weight:700}
 .err{margin-top:10px;color:#ffd2d2}
-</style></head><body>
+"""
+
+register_asset("auth.css", AUTH_CSS)
+
+LOGIN_HTML = """
+<!doctype html><html lang="tr"><head>
+<meta charset="utf-8"><meta name="viewport" content="width=device-width,initial-scale=1">
+<title>Giriş</title>
+<link rel="stylesheet" href="{{ asset_url('auth.css') }}"></head><body>
 <div class="card">
   <h2 style="margin:0 0 6px">Giriş</h2>
   <div style="color:#93a4c7;font-size:13px;margin-bottom:10px">Kelime Quiz hesabınla giriş yap</div>
@@ -433,106 +2234,110 @@ REGISTER_HTML = (
 
 
 # ----------------- QUIZ HTML -----------------
+QUIZ_CSS = """
+:root{
+  --bg:#0b1220;
+  --muted:#93a4c7;
+  --text:#eaf0ff;
+  --accent:#6ee7ff;
+  --accent2:#a78bfa;
+  --line:rgba(255,255,255,.08);
+  --shadow: 0 12px 30px rgba(0,0,0,.35);
+  --radius:18px;
+}
+*{box-sizing:border-box}
+body{
+  margin:0;
+  font-family: ui-sans-serif, system-ui, -apple-system, Segoe UI, Roboto, Arial;
+  background: radial-gradient(900px 500px at 10% 0%, rgba(110,231,255,.14), transparent 60%),
+              radial-gradient(900px 500px at 90% 10%, rgba(167,139,250,.14), transparent 60%),
+              var(--bg);
+  color:var(--text);
+  min-height:100vh;
+  display:flex;
+  align-items:center;
+  justify-content:center;
+  padding:24px;
+}
+.wrap{width:min(980px,100%)}
+header{
+  display:flex;
+  align-items:center;
+  justify-content:space-between;
+  gap:12px;
+  margin-bottom:14px;
+  flex-wrap:wrap;
+}
+.brand{display:flex; align-items:center; gap:10px; font-weight:700;}
+.logo{
+  width:38px; height:38px; border-radius:12px;
+  background: linear-gradient(135deg, rgba(110,231,255,.9), rgba(167,139,250,.9));
+  box-shadow: var(--shadow);
+}
+.sub{color:var(--muted); font-size:13px}
+.card{
+  background: linear-gradient(180deg, rgba(255,255,255,.06), rgba(255,255,255,.03));
+  border: 1px solid var(--line);
+  border-radius: var(--radius);
+  box-shadow: var(--shadow);
+  overflow:hidden;
+}
+.grid{display:grid; grid-template-columns: 1.2fr .8fr;}
+@media (max-width: 860px){ .grid{grid-template-columns: 1fr} }
+.panel{padding:22px}
+.panel + .panel{border-left:1px solid var(--line)}
+@media (max-width: 860px){ .panel + .panel{border-left:none; border-top:1px solid var(--line)} }
+.qtitle{font-size:14px; color:var(--muted); margin:0 0 8px}
+.question{font-size:28px; margin:0 0 18px; line-height:1.2;}
+.pill{
+  display:inline-flex; align-items:center; gap:8px;
+  padding:8px 12px; border:1px solid var(--line); border-radius:999px;
+  color:var(--muted); font-size:13px; background: rgba(0,0,0,.18);
+}
+.row{display:flex; gap:10px; align-items:center; flex-wrap:wrap}
+input{
+  width:100%; padding:12px 14px; border-radius:14px;
+  border:1px solid rgba(255,255,255,.12); outline:none;
+  background: rgba(0,0,0,.20); color:var(--text); font-size:15px;
+}
+input::placeholder{color:rgba(234,240,255,.45)}
+.btn{
+  cursor:pointer; border:none; padding:12px 14px; border-radius:14px;
+  font-weight:700; color:#07111f;
+  background: linear-gradient(135deg, rgba(110,231,255,.95), rgba(167,139,250,.95));
+  box-shadow: 0 10px 20px rgba(110,231,255,.12);
+  white-space:nowrap; display:inline-block; text-decoration:none;
+}
+.btn.secondary{background: rgba(255,255,255,.08); color:var(--text); border:1px solid var(--line); box-shadow:none;}
+.btn.active{background: linear-gradient(135deg, rgba(110,231,255,.95), rgba(167,139,250,.95)); color:#07111f; border:none;}
+.hint{margin-top:12px; color:var(--muted); font-size:13px; line-height:1.4;}
+.alert{
+  margin-top:14px; padding:12px 14px; border-radius:14px;
+  border:1px solid rgba(239,68,68,.35); background: rgba(239,68,68,.10);
+  color:#ffd2d2; display:flex; justify-content:space-between; align-items:center; gap:10px;
+}
+.alert code{
+  background: rgba(0,0,0,.25); padding:3px 8px; border-radius:10px;
+  border:1px solid rgba(255,255,255,.10); color:#fff;
+  font-family: ui-monospace, SFMono-Regular, Menlo, Consolas, monospace; font-size:13px;
+}
+a.link{color: var(--accent); text-decoration:none; font-weight:700;}
+a.link:hover{text-decoration:underline}
+.formGrid{display:grid; grid-template-columns: 1fr 1fr auto; gap:10px;}
+@media (max-width: 520px){ .formGrid{grid-template-columns: 1fr} .btn{width:100%} }
+.footer{margin-top:12px; display:flex; justify-content:space-between; gap:12px; flex-wrap:wrap; color:var(--muted); font-size:12px;}
+.kbd{border:1px solid rgba(255,255,255,.14); padding:2px 7px; border-radius:8px; background: rgba(0,0,0,.22); color: rgba(234,240,255,.85); font-weight:700; font-size:12px;}
+"""
+
+register_asset("quiz.css", QUIZ_CSS)
+
 HTML = """<!doctype html>
 <html lang="tr">
 <head>
   <meta charset="utf-8" />
   <meta name="viewport" content="width=device-width, initial-scale=1" />
   <title>Kelime Quiz</title>
-  <style>
-    :root{
-      --bg:#0b1220;
-      --muted:#93a4c7;
-      --text:#eaf0ff;
-      --accent:#6ee7ff;
-      --accent2:#a78bfa;
-      --line:rgba(255,255,255,.08);
-      --shadow: 0 12px 30px rgba(0,0,0,.35);
-      --radius:18px;
-    }
-    *{box-sizing:border-box}
-    body{
-      margin:0;
-      font-family: ui-sans-serif, system-ui, -apple-system, Segoe UI, Roboto, Arial;
-      background: radial-gradient(900px 500px at 10% 0%, rgba(110,231,255,.14), transparent 60%),
-                  radial-gradient(900px 500px at 90% 10%, rgba(167,139,250,.14), transparent 60%),
-                  var(--bg);
-      color:var(--text);
-      min-height:100vh;
-      display:flex;
-      align-items:center;
-      justify-content:center;
-      padding:24px;
-    }
-    .wrap{width:min(980px,100%)}
-    header{
-      display:flex;
-      align-items:center;
-      justify-content:space-between;
-      gap:12px;
-      margin-bottom:14px;
-      flex-wrap:wrap;
-    }
-    .brand{display:flex; align-items:center; gap:10px; font-weight:700;}
-    .logo{
-      width:38px; height:38px; border-radius:12px;
-      background: linear-gradient(135deg, rgba(110,231,255,.9), rgba(167,139,250,.9));
-      box-shadow: var(--shadow);
-    }
-    .sub{color:var(--muted); font-size:13px}
-    .card{
-      background: linear-gradient(180deg, rgba(255,255,255,.06), rgba(255,255,255,.03));
-      border: 1px solid var(--line);
-      border-radius: var(--radius);
-      box-shadow: var(--shadow);
-      overflow:hidden;
-    }
-    .grid{display:grid; grid-template-columns: 1.2fr .8fr;}
-    @media (max-width: 860px){ .grid{grid-template-columns: 1fr} }
-    .panel{padding:22px}
-    .panel + .panel{border-left:1px solid var(--line)}
-    @media (max-width: 860px){ .panel + .panel{border-left:none; border-top:1px solid var(--line)} }
-    .qtitle{font-size:14px; color:var(--muted); margin:0 0 8px}
-    .question{font-size:28px; margin:0 0 18px; line-height:1.2;}
-    .pill{
-      display:inline-flex; align-items:center; gap:8px;
-      padding:8px 12px; border:1px solid var(--line); border-radius:999px;
-      color:var(--muted); font-size:13px; background: rgba(0,0,0,.18);
-    }
-    .row{display:flex; gap:10px; align-items:center; flex-wrap:wrap}
-    input{
-      width:100%; padding:12px 14px; border-radius:14px;
-      border:1px solid rgba(255,255,255,.12); outline:none;
-      background: rgba(0,0,0,.20); color:var(--text); font-size:15px;
-    }
-    input::placeholder{color:rgba(234,240,255,.45)}
-    .btn{
-      cursor:pointer; border:none; padding:12px 14px; border-radius:14px;
-      font-weight:700; color:#07111f;
-      background: linear-gradient(135deg, rgba(110,231,255,.95), rgba(167,139,250,.95));
-      box-shadow: 0 10px 20px rgba(110,231,255,.12);
-      white-space:nowrap; display:inline-block; text-decoration:none;
-    }
-    .btn.secondary{background: rgba(255,255,255,.08); color:var(--text); border:1px solid var(--line); box-shadow:none;}
-    .btn.active{background: linear-gradient(135deg, rgba(110,231,255,.95), rgba(167,139,250,.95)); color:#07111f; border:none;}
-    .hint{margin-top:12px; color:var(--muted); font-size:13px; line-height:1.4;}
-    .alert{
-      margin-top:14px; padding:12px 14px; border-radius:14px;
-      border:1px solid rgba(239,68,68,.35); background: rgba(239,68,68,.10);
-      color:#ffd2d2; display:flex; justify-content:space-between; align-items:center; gap:10px;
-    }
-    .alert code{
-      background: rgba(0,0,0,.25); padding:3px 8px; border-radius:10px;
-      border:1px solid rgba(255,255,255,.10); color:#fff;
-      font-family: ui-monospace, SFMono-Regular, Menlo, Consolas, monospace; font-size:13px;
-    }
-    a.link{color: var(--accent); text-decoration:none; font-weight:700;}
-    a.link:hover{text-decoration:underline}
-    .formGrid{display:grid; grid-template-columns: 1fr 1fr auto; gap:10px;}
-    @media (max-width: 520px){ .formGrid{grid-template-columns: 1fr} .btn{width:100%} }
-    .footer{margin-top:12px; display:flex; justify-content:space-between; gap:12px; flex-wrap:wrap; color:var(--muted); font-size:12px;}
-    .kbd{border:1px solid rgba(255,255,255,.14); padding:2px 7px; border-radius:8px; background: rgba(0,0,0,.22); color: rgba(234,240,255,.85); font-weight:700; font-size:12px;}
-  </style>
+  <link rel="stylesheet" href="{{ asset_url('quiz.css') }}">
 </head>
 <body>
   <div class="wrap">
@@ -544,6 +2349,7 @@ HTML = """<!doctype html>
       </div>
 
       <div style="display:flex; gap:12px; align-items:center; flex-wrap:wrap; justify-content:flex-end;">
+        <a class="link" href="/search">Ara</a>
         <a class="link" href="/stats?level={{level}}">İstatistik →</a>
 
         <div style="display:flex; gap:8px; flex-wrap:wrap; justify-content:flex-end;">
@@ -561,18 +2367,22 @@ HTML = """<!doctype html>
       <div class="grid">
         <div class="panel">
           <p class="qtitle">Soru</p>
+          {% if ticket %}
           <h1 class="question">{{question}}</h1>
 
           <form method="post" action="/?level={{level}}">
             <div class="row" style="width:100%">
               <div style="flex:1; min-width:220px">
                 <input name="answer" autofocus placeholder="Cevabını yaz..." />
-                <input type="hidden" name="ing" value="{{word.ing}}">
-                <input type="hidden" name="correct_answer" value="{{correct_answer}}">
+                <input type="hidden" name="ticket" value="{{ticket}}">
               </div>
               <button class="btn" type="submit">Kontrol</button>
             </div>
           </form>
+          {% else %}
+          <h1 class="question">Sorulacak kelime yok</h1>
+          <div class="hint">Önce kelime ekle.</div>
+          {% endif %}
 
           {% if right %}
           <div class="alert" style="border-color: rgba(34,197,94,.35); background: rgba(34,197,94,.10); color:#c9fddc;">
@@ -623,6 +2433,36 @@ HTML = """<!doctype html>
 """
 
 
+# ----------------- TEMPLATE REGISTRY -----------------
+# render_template_string her çağrıda kaynağı yeniden derler (from_string).
+# Burada her şablon ilk kullanımda bir kez derlenip saklanır.
+TEMPLATES = {}
+_compiled_templates = {}
+
+
+def register_template(name: str, source: str):
+    TEMPLATES[name] = source
+    _compiled_templates.pop(name, None)
+
+
+def get_template(name: str):
+    tpl = _compiled_templates.get(name)
+    if tpl is None:
+        tpl = _compiled_templates[name] = app.jinja_env.from_string(TEMPLATES[name])
+    return tpl
+
+
+def render(name: str, **context):
+    app.update_template_context(context)
+    with metric_timer("kelimeweb_template_render_seconds", template=name):
+        return get_template(name).render(context)
+
+
+register_template("login", LOGIN_HTML)
+register_template("register", REGISTER_HTML)
+register_template("quiz", HTML)
+
+
 # ----------------- ROUTES -----------------
 @app.route("/login", methods=["GET", "POST"])
 def login():
@@ -631,15 +2471,22 @@ def login():
         username = request.form.get("username", "").strip().lower()
         password = request.form.get("password", "")
 
-        users = load_users()
-        user = users.get(username)
-        if not user or not check_password_hash(user["pw"], password):
+        if not login_ip_bucket.take(request.remote_addr or "-") or not login_user_bucket.take(username):
+            return render("login", error="Çok fazla deneme. Biraz bekleyip tekrar dene."), 429
+
+        user = get_user(username)
+        try:
+            ok = bool(user) and verify_password(user["pw"], password)
+        except HashPoolBusy:
+            return render("login", error="Sunucu şu an yoğun, tekrar dene."), 503
+        if not ok:
             error = "Kullanıcı adı veya şifre yanlış."
         else:
             session["user"] = username
+            session["role"] = user.get("role", "user")
             return redirect(url_for("index"))
 
-    return render_template_string(LOGIN_HTML, error=error)
+    return render("login", error=error)
 
 
 @app.route("/register", methods=["GET", "POST"])
@@ -649,27 +2496,34 @@ def register():
         username = request.form.get("username", "").strip().lower()
         password = request.form.get("password", "")
 
+        if not login_ip_bucket.take(request.remote_addr or "-"):
+            return render("register", error="Çok fazla deneme. Biraz bekleyip tekrar dene."), 429
+
         if len(username) < 3:
             error = "Kullanıcı adı en az 3 karakter olsun."
         elif len(password) < 4:
             error = "Şifre en az 4 karakter olsun."
         else:
-            users = load_users()
-            if username in users:
+            if get_user(username):
                 error = "Bu kullanıcı adı zaten var."
             else:
-                users[username] = {"pw": generate_password_hash(password), "role": "user"}
-                
-                save_users(users)
+                try:
+                    pw = hash_password(password)
+                except HashPoolBusy:
+                    return render("register", error="Sunucu şu an yoğun, tekrar dene."), 503
+                if not save_user(username, {"pw": pw, "role": "user"}, overwrite=False):
+                    return render("register", error="Bu kullanıcı adı zaten var.")
                 session["user"] = username
+                session["role"] = "user"
                 return redirect(url_for("index"))
 
-    return render_template_string(REGISTER_HTML, error=error)
+    return render("register", error=error)
 
 
 @app.route("/logout")
 def logout():
     session.pop("user", None)
+    session.pop("role", None)
     return redirect(url_for("login"))
 
 
@@ -677,54 +2531,50 @@ def logout():
 @login_required
 def index():
     level = request.args.get("level", "A1").upper()
-    if level not in ["A1", "A2", "B1", "B2", "C1", "C2"]:
+    if level not in LEVELS:
         level = "A1"
 
-    all_words = load_words()
-    level_words = [w for w in all_words if w.get("level", "A1").upper() == level]
-    if not level_words:
-        level_words = all_words
-
     last = None
     wrong = False
     right = False
     show_correct = ""
 
-    def norm(s: str) -> str:
-        return (s or "").strip().casefold()
+    all_words = load_words()
 
     if request.method == "POST":
-        ing = request.form.get("ing", "")
-        user_answer = norm(request.form.get("answer", ""))
-
-        correct_answer_raw = request.form.get("correct_answer", "")
-        correct_answer = norm(correct_answer_raw)
+        # cevap bilette; kelime listesi sadece biletin daha önce kullanılmadığını doğrulamak için gerekir
+        ticket = read_ticket(current_user(), request.form.get("ticket", ""))
 
-        w = next((x for x in all_words if x.get("ing") == ing), None)
-
-        if w:
-            if user_answer == correct_answer:
-                w["d"] = int(w.get("d", 0)) + 1
+        if ticket and ticket_unused(ticket, all_words):
+            if check_answer(request.form.get("answer", ""), ticket["answer"]):
                 right = True
             else:
-                w["y"] = int(w.get("y", 0)) + 1
                 wrong = True
-                show_correct = correct_answer_raw
+                show_correct = ticket["answer"]
 
-            save_words(all_words)
-            last = ing
+            record_answer(current_user(), ticket["ing"], right, {ticket["ing"]: ticket})
+            last = ticket["ing"]
+            # storage cache'teki kümeyi genelde yerinde günceller; sadece güncellemediyse (cache başka nesneye
+            # geçti, write-behind cevabı henüz bir kümeye bağlamadı) yeniden istenir, o da cache'ten gelir
+            if ticket_unused(ticket, all_words):
+                all_words = load_words()
 
-    word, direction, question, correct_answer_raw = pick_word(level_words, last)
+    level_words = all_words.level(level) or all_words.words
 
-    return render_template_string(
-        HTML,
+    if QUIZ_SCHEDULER == "leitner":
+        word, direction, question, correct_answer_raw = pick_due_word(all_words, level, last)
+    else:
+        word, direction, question, correct_answer_raw = pick_word(level_words, last)
+
+    return render(
+        "quiz",
         question=question,
-        word=type("obj", (object,), word),
+        word=word,
         wrong=wrong,
         right=right,
         correct=show_correct,
         direction=direction,
-        correct_answer=correct_answer_raw,
+        ticket=issue_ticket(current_user(), word, direction, correct_answer_raw) if word is not None else None,
         level=level,
         user=current_user(),
     )
@@ -739,140 +2589,533 @@ def add():
     tr = request.form.get("tr", "").strip().lower()
     level = request.form.get("level", "A1").upper()
 
-    if level not in ["A1", "A2", "B1", "B2", "C1", "C2"]:
+    if level not in LEVELS:
         level = "A1"
 
-    if ing and tr:
-        all_words.append({"ing": ing, "tr": tr, "level": level, "d": 0, "y": 0})
+    if ing and tr and add_or_merge_word(all_words, ing, tr, level) != "skipped":
         save_words(all_words)
 
     return redirect(url_for("index", level=level))
 
 
-@app.route("/stats")
+# ----------------- BULK IMPORT -----------------
+# CSV (ing,tr[,level]) veya JSONL ({"ing","tr","level"}) satır satır okunur; yükleme belleğe alınmaz.
+# Var olan ing'e gelen yeni anlam birleştirilir ("şans" + "ihtimal" -> "şans / ihtimal"),
+# tüm içe aktarma tek bir save_words ile yazılır. UTF-8 olmayan dosya UnicodeDecodeError verir; yazım sonda
+# olduğundan o ana kadar okunanlar kaydedilmez (route 400 döner).
+def _split_meanings(tr: str):
+    return [p.strip() for p in (tr or "").split("/") if p.strip()]
+
+
+def merge_meanings(old: str, new: str) -> str:
+    parts = _split_meanings(old)
+    seen = {p.casefold() for p in parts}
+    for p in _split_meanings(new):
+        if p.casefold() not in seen:
+            seen.add(p.casefold())
+            parts.append(p)
+    return " / ".join(parts)
+
+
+def add_or_merge_word(words, ing: str, tr: str, level: str) -> str:
+    w = words.get(ing)
+    if w is None:
+        words.append(Word(_intern(ing), _intern(tr), level_name(level)))
+        return "added"
+    merged = merge_meanings(w.get("tr", ""), tr)
+    if merged == w.get("tr", ""):
+        return "skipped"
+    words.set_tr(w, _intern(merged))
+    return "merged"
+
+
+def guess_import_format(filename: str | None, mimetype: str | None) -> str:
+    name = (filename or "").lower()
+    if name.endswith((".jsonl", ".ndjson")) or (mimetype or "") in ("application/x-ndjson", "application/jsonl"):
+        return "jsonl"
+    return "csv"
+
+
+def iter_import_rows(stream, fmt: str):
+    # (ing, tr, level) üretir; okunamayan satır için None
+    if not hasattr(stream, "read1"):
+        stream = io.BufferedReader(stream)
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        if fmt == "jsonl":
+            for line in text:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    yield None
+                    continue
+                if isinstance(row, dict):
+                    yield row.get("ing"), row.get("tr"), row.get("level")
+                elif isinstance(row, list) and len(row) >= 2:
+                    yield row[0], row[1], row[2] if len(row) > 2 else None
+                else:
+                    yield None
+        else:
+            for i, row in enumerate(csv.reader(text)):
+                if not row or (i == 0 and row[0].strip().lower() == "ing"):
+                    continue
+                if len(row) < 2:
+                    yield None
+                    continue
+                yield row[0], row[1], row[2] if len(row) > 2 else None
+    finally:
+        text.detach()
+
+
+def import_words(username: str, stream, fmt: str, default_level: str = "A1"):
+    words = storage.load_words(username)
+    counts = {"added": 0, "merged": 0, "skipped": 0, "invalid": 0}
+    for row in iter_import_rows(stream, fmt):
+        # JSONL'de sayı/liste gibi değerler str()'lenip kelime olarak kaydedilmez
+        if row is None or not all(v is None or isinstance(v, str) for v in row):
+            counts["invalid"] += 1
+            continue
+        ing, tr, level = ((v or "").strip() for v in row)
+        ing, tr, level = ing.lower(), tr.lower(), level.upper() or default_level
+        if not ing or not tr:
+            counts["invalid"] += 1
+            continue
+        if level not in LEVELS:
+            level = default_level
+        counts[add_or_merge_word(words, ing, tr, level)] += 1
+    if counts["added"] or counts["merged"]:
+        storage.save_words(username, words)
+    return counts
+
+
+@app.route("/import", methods=["POST"])
 @login_required
-def stats():
-    level = request.args.get("level", "ALL").upper()
-    valid_levels = ["A1", "A2", "B1", "B2", "C1", "C2", "ALL"]
-    if level not in valid_levels:
-        level = "ALL"
-
-    words = load_words()
-
-    if level == "ALL":
-        filtered = words
+def import_route():
+    level = request.args.get("level", "A1").upper()
+    if level not in LEVELS:
+        level = "A1"
+    upload = request.files.get("file") if request.mimetype == "multipart/form-data" else None
+    if upload:
+        stream, fmt = upload.stream, guess_import_format(upload.filename, upload.mimetype)
     else:
-        filtered = [w for w in words if w.get("level", "A1").upper() == level]
+        stream, fmt = request.stream, guess_import_format(None, request.mimetype)
+    fmt = request.args.get("format", fmt)
+    if fmt not in ("csv", "jsonl"):
+        return jsonify(error="format must be csv or jsonl"), 400
+    try:
+        return jsonify(import_words(current_user(), stream, fmt, level))
+    except UnicodeDecodeError:
+        return jsonify(error="file must be UTF-8 encoded"), 400
+
+
+@app.cli.command("import-words")
+@click.argument("username")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "fmt", type=click.Choice(["csv", "jsonl"]), default=None)
+@click.option("--level", default="A1", show_default=True)
+def import_words_command(username, path, fmt, level):
+    with open(path, "rb") as f:
+        try:
+            counts = import_words(username.strip().lower(), f, fmt or guess_import_format(path, None), level.upper())
+        except UnicodeDecodeError:
+            raise click.ClickException(f"{path}: UTF-8 değil")
+    click.echo(json.dumps(counts))
 
-    rows = ""
-    for w in filtered:
-        d = int(w.get("d", 0))
-        y = int(w.get("y", 0))
-        total = d + y
-        pct = int((d / total) * 100) if total else 0
 
-        rows += f"""
-        <tr>
-            <td><b>{w.get('ing','')}</b></td>
-            <td>{w.get('tr','')}</td>
-            <td>{w.get('level','A1')}</td>
-            <td>{d}</td>
-            <td>{y}</td>
-            <td>%{pct}</td>
-        </tr>
-        """
+# ----------------- STATS -----------------
+STATS_PAGE_SIZE = 100
+STATS_MAX_PAGE_SIZE = 500
 
-    def btn(lvl, text=None):
-        text = text or lvl
-        cls = "btn active" if level == lvl else "btn secondary"
-        return f'<a class="{cls}" href="/stats?level={lvl}">{text}</a>'
-
-    level_buttons = (
-        '<div style="display:flex; gap:8px; flex-wrap:wrap; justify-content:flex-end;">'
-        + btn("ALL", "ALL")
-        + btn("A1")
-        + btn("A2")
-        + btn("B1")
-        + btn("B2")
-        + btn("C1")
-        + btn("C2")
-        + "</div>"
-    )
+STATS_CSS = """
+body{font-family:system-ui;background:#0b1220;color:#eaf0ff;min-height:100vh;padding:24px}
+a{color:#6ee7ff;text-decoration:none;font-weight:700}
+table{width:100%;border-collapse:collapse;margin-top:14px}
+th,td{border-bottom:1px solid rgba(255,255,255,.1);padding:10px;text-align:left}
+.wrap{max-width:980px;margin:0 auto}
+.btn{padding:8px 10px;border-radius:12px;border:1px solid rgba(255,255,255,.14);background:rgba(255,255,255,.08);color:#eaf0ff;font-weight:700;text-decoration:none}
+.btn.active{background: linear-gradient(135deg, rgba(110,231,255,.95), rgba(167,139,250,.95));color:#07111f;border:none}
+.pager{display:flex;justify-content:space-between;align-items:center;gap:10px;margin-top:14px;opacity:.9}
+.cards{display:flex;gap:10px;flex-wrap:wrap;margin-top:14px}
+.card{flex:1;min-width:120px;padding:10px 12px;border-radius:12px;background:rgba(255,255,255,.06);border:1px solid rgba(255,255,255,.1)}
+.card b{display:block;font-size:22px}
+.bars{display:flex;align-items:flex-end;gap:2px;height:60px;margin-top:10px}
+.bars span{flex:1;min-height:2px;border-radius:2px;background:rgba(110,231,255,.75)}
+.bars span.empty{background:rgba(255,255,255,.1)}
+"""
 
-    return f"""
+register_asset("stats.css", STATS_CSS)
+
+STATS_HEAD_HTML = """
 <!doctype html>
 <html lang="tr">
 <head>
   <meta charset="utf-8" />
   <meta name="viewport" content="width=device-width, initial-scale=1" />
   <title>İstatistik • Kelime Quiz</title>
-  <style>
-    body{{font-family:system-ui;background:#0b1220;color:#eaf0ff;min-height:100vh;padding:24px}}
-    a{{color:#6ee7ff;text-decoration:none;font-weight:700}}
-    table{{width:100%;border-collapse:collapse;margin-top:14px}}
-    th,td{{border-bottom:1px solid rgba(255,255,255,.1);padding:10px;text-align:left}}
-    .wrap{{max-width:980px;margin:0 auto}}
-    .btn{{padding:8px 10px;border-radius:12px;border:1px solid rgba(255,255,255,.14);background:rgba(255,255,255,.08);color:#eaf0ff;font-weight:700;text-decoration:none}}
-    .btn.active{{background: linear-gradient(135deg, rgba(110,231,255,.95), rgba(167,139,250,.95));color:#07111f;border:none}}
-  </style>
+  <link rel="stylesheet" href="{{ asset_url('stats.css') }}">
 </head>
 <body>
   <div class="wrap">
     <div style="display:flex; justify-content:space-between; gap:12px; flex-wrap:wrap; align-items:center;">
       <div>
         <h2 style="margin:0">İstatistik</h2>
-        <div style="opacity:.8">Kullanıcı: <b>{current_user()}</b> • Seviye: <b>{level}</b></div>
+        <div style="opacity:.8">Kullanıcı: <b>{{user}}</b> • Seviye: <b>{{level}}</b> • {{total}} kelime</div>
       </div>
       <div style="display:flex; gap:10px; flex-wrap:wrap; align-items:center;">
-        {level_buttons}
+        <div style="display:flex; gap:8px; flex-wrap:wrap; justify-content:flex-end;">
+          {% for lvl, href in level_links %}
+          <a class="{{ 'btn active' if level == lvl else 'btn secondary' }}" href="{{href}}">{{lvl}}</a>
+          {% endfor %}
+        </div>
         <a href="/" style="color:#6ee7ff;font-weight:700">← Quiz</a>
       </div>
     </div>
 
+    <div class="cards">
+      {% for w in daily.windows %}
+      <div class="card">Son {{w.days}} gün<b>{% if w.pct is none %}-{% else %}%{{w.pct}}{% endif %}</b>{{w.d}} doğru • {{w.y}} yanlış</div>
+      {% endfor %}
+      <div class="card">Seri<b>{{daily.streak}} gün</b>En uzun: {{daily.longest}} gün</div>
+    </div>
+    <div class="bars" title="Son {{daily.bars|length}} gün, günlük cevap sayısı">
+      {% for b in daily.bars %}<span class="{{ '' if b.n else 'empty' }}" style="height:{{b.h}}%" title="{{b.n}} cevap"></span>{% endfor %}
+    </div>
+
     <table>
       <thead>
         <tr>
           <th>İngilizce</th>
           <th>Türkçe</th>
-          <th>Seviye</th>
+          <th><a href="{{sort_links.level}}">Seviye</a></th>
           <th>Doğru</th>
-          <th>Yanlış</th>
-          <th>Başarı</th>
+          <th><a href="{{sort_links.wrong}}">Yanlış</a></th>
+          <th><a href="{{sort_links.pct}}">Başarı</a></th>
         </tr>
       </thead>
       <tbody>
-        {rows}
+"""
+
+STATS_TAIL_HTML = """
       </tbody>
     </table>
+    <div class="pager">
+      <div>{% if prev_href %}<a class="btn secondary" href="{{prev_href}}">← Önceki</a>{% endif %}</div>
+      <div>Sayfa {{page}} / {{pages}}</div>
+      <div>{% if next_href %}<a class="btn secondary" href="{{next_href}}">Sonraki →</a>{% endif %}</div>
+    </div>
   </div>
 </body>
 </html>
 """
 
+register_template("stats_head", STATS_HEAD_HTML)
+register_template("stats_tail", STATS_TAIL_HTML)
+
+
+def _int_arg(name: str, default: int) -> int:
+    try:
+        return int(request.args.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _stats_row(w) -> str:
+    d = int(w.get("d", 0))
+    y = int(w.get("y", 0))
+    return f"""
+        <tr>
+            <td><b>{escape(w.get('ing', ''))}</b></td>
+            <td>{escape(w.get('tr', ''))}</td>
+            <td>{escape(w.get('level', 'A1'))}</td>
+            <td>{d}</td>
+            <td>{y}</td>
+            <td>%{_success_pct(w)}</td>
+        </tr>
+        """
+
+
+@app.route("/stats")
+@login_required
+def stats():
+    level = request.args.get("level", "ALL").upper()
+    if level not in LEVELS + ["ALL"]:
+        level = "ALL"
+    sort = request.args.get("sort", "")
+    if sort not in WORD_ORDERS:
+        sort = ""
+    desc = request.args.get("dir", "desc" if sort else "asc") == "desc"
+    per = min(max(_int_arg("per", STATS_PAGE_SIZE), 1), STATS_MAX_PAGE_SIZE)
+
+    # günlük özet gün dönünce de değişir; .days dosyası yazma-arkası tamponda bekleyen cevapları da içerir
+    etag = data_etag(
+        "stats",
+        current_user(),
+        len(load_catalog()),
+        storage.words_version(current_user()),
+        day_number(),
+        _stat_key(_stat_or_none(days_file_for(current_user()))),
+        request.query_string,
+    )
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    words = load_words()
+    total = len(words) if level == "ALL" else len(words.level(level))
+    pages = max(1, -(-total // per))
+    page = min(max(_int_arg("page", 1), 1), pages)
+    start, end = (page - 1) * per, min(page * per, total)
+
+    if sort:
+        rows = words.page(level, sort, start, end, desc)
+    else:
+        rows = (words.words if level == "ALL" else words.level(level))[start:end]
+
+    def link(**changes):
+        args = {"level": level, "sort": sort, "dir": "desc" if desc else "asc", "per": per, "page": page}
+        args.update(changes)
+        if not args["sort"]:
+            args.pop("sort")
+            args.pop("dir")
+        if args["per"] == STATS_PAGE_SIZE:
+            args.pop("per")
+        return url_for("stats", **args)
+
+    # aynı sütuna tekrar tıklamak yönü çevirir
+    sort_links = {
+        key: link(sort=key, dir="asc" if sort == key and desc else "desc", page=1)
+        for key in WORD_ORDERS
+    }
+    head = dict(
+        user=current_user(),
+        level=level,
+        total=total,
+        level_links=[(lvl, link(level=lvl, page=1)) for lvl in ["ALL"] + LEVELS],
+        sort_links=sort_links,
+        daily=daily_summary(current_user(), level),
+    )
+    tail = dict(
+        page=page,
+        pages=pages,
+        prev_href=link(page=page - 1) if page > 1 else None,
+        next_href=link(page=page + 1) if page < pages else None,
+    )
+
+    def generate():
+        yield render("stats_head", **head)
+        buf = []
+        for w in rows:
+            buf.append(_stats_row(w))
+            if len(buf) >= 50:
+                yield "".join(buf)
+                buf = []
+        yield "".join(buf)
+        yield render("stats_tail", **tail)
+
+    return with_etag(Response(stream_with_context(generate()), mimetype="text/html"), etag)
+
+
+# ----------------- SEARCH -----------------
+SEARCH_LIMIT = 50
+AUTOCOMPLETE_LIMIT = 10
+
+SEARCH_HTML = """
+<!doctype html>
+<html lang="tr">
+<head>
+  <meta charset="utf-8" />
+  <meta name="viewport" content="width=device-width, initial-scale=1" />
+  <title>Ara • Kelime Quiz</title>
+  <link rel="stylesheet" href="{{ asset_url('stats.css') }}">
+</head>
+<body>
+  <div class="wrap">
+    <div style="display:flex; justify-content:space-between; gap:12px; flex-wrap:wrap; align-items:center;">
+      <div>
+        <h2 style="margin:0">Kelime ara</h2>
+        <div style="opacity:.8">Kullanıcı: <b>{{user}}</b> • İngilizce veya Türkçe başlangıcı yaz</div>
+      </div>
+      <a href="/" style="color:#6ee7ff;font-weight:700">← Quiz</a>
+    </div>
+    <form method="get" action="/search" style="display:flex; gap:10px; margin-top:14px">
+      <input name="q" value="{{q}}" list="search-suggest" autofocus autocomplete="off" placeholder="örn: app, elm"
+             style="flex:1;padding:10px 12px;border-radius:12px;border:1px solid rgba(255,255,255,.14);background:rgba(0,0,0,.2);color:#eaf0ff">
+      <datalist id="search-suggest"></datalist>
+      <button class="btn" type="submit">Ara</button>
+    </form>
+    {% if q %}
+    <table>
+      <thead><tr><th>İngilizce</th><th>Türkçe</th><th>Seviye</th><th>Doğru</th><th>Yanlış</th></tr></thead>
+      <tbody>
+        {% for w in results %}
+        <tr><td><b>{{w.ing}}</b></td><td>{{w.tr}}</td><td>{{w.level or "A1"}}</td><td>{{w.d or 0}}</td><td>{{w.y or 0}}</td></tr>
+        {% else %}
+        <tr><td colspan="5" style="opacity:.8">Sonuç yok.</td></tr>
+        {% endfor %}
+      </tbody>
+    </table>
+    {% endif %}
+  </div>
+  <script>
+    // yazdıkça öneri: /api/v1/words/autocomplete
+    const input = document.querySelector('input[name=q]'), list = document.getElementById('search-suggest');
+    let timer = null;
+    input.addEventListener('input', () => {
+      clearTimeout(timer);
+      timer = setTimeout(async () => {
+        if (!input.value.trim()) { list.innerHTML = ''; return; }
+        const r = await fetch('/api/v1/words/autocomplete?q=' + encodeURIComponent(input.value));
+        if (!r.ok) return;
+        const data = await r.json();
+        list.innerHTML = '';
+        for (const s of data.suggestions) {
+          const o = document.createElement('option');
+          o.value = s.ing;
+          o.label = s.tr;
+          list.appendChild(o);
+        }
+      }, 120);
+    });
+  </script>
+</body>
+</html>
+"""
+
+register_template("search", SEARCH_HTML)
+
+
+@app.route("/search")
+@login_required
+def search():
+    q = request.args.get("q", "").strip()
+    results = load_words().search(q, SEARCH_LIMIT) if q else []
+    return render("search", q=q, results=results, user=current_user())
+
+
+# ----------------- JSON API (v1) -----------------
+API_MAX_BATCH = 100
+
+
+def api_login_required(fn):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not current_user():
+            return jsonify(error="login required"), 401
+        return fn(*args, **kwargs)
+
+    return wrapper
+
+
+@app.route("/api/v1/questions")
+@api_login_required
+def api_questions():
+    level = request.args.get("level", "A1").upper()
+    if level not in LEVELS:
+        level = "A1"
+    n = min(max(_int_arg("n", 20), 1), API_MAX_BATCH)
+
+    username = current_user()
+    questions = pick_questions(load_words(), level, n)
+    return jsonify(
+        level=level,
+        questions=[
+            {
+                "ing": w["ing"],
+                "direction": direction,
+                "question": question,
+                "answer": answer,
+                "ticket": issue_ticket(username, w, direction, answer),
+            }
+            for w, direction, question, answer in questions
+        ],
+    )
+
+
+@app.route("/api/v1/words/autocomplete")
+@api_login_required
+def api_autocomplete():
+    q = request.args.get("q", "")
+    level = request.args.get("level", "").upper()
+    limit = min(max(_int_arg("limit", AUTOCOMPLETE_LIMIT), 1), API_MAX_BATCH)
+    words = load_words().search(q, limit, level if level in LEVELS else None)
+    return jsonify(
+        q=q,
+        suggestions=[{"ing": w["ing"], "tr": w.get("tr", ""), "level": w.get("level", "A1")} for w in words],
+    )
+
+
+@app.route("/api/v1/answers", methods=["POST"])
+@api_login_required
+def api_answers():
+    # {"answers": [{"ticket": "...", "answer": "..."}]}; her bilet bir kez puanlanır
+    payload = request.get_json(silent=True)
+    items = payload.get("answers") if isinstance(payload, dict) else None
+    if not isinstance(items, list) or len(items) > API_MAX_BATCH:
+        return jsonify(error=f"answers must be a list of at most {API_MAX_BATCH} items"), 400
+
+    username = current_user()
+    words = load_words()
+    graded, results, levels = [], [], {}
+    for item in items:
+        if not isinstance(item, dict) or "ticket" not in item:
+            results.append({"recorded": False, "error": "ticket required"})
+            continue
+        if not isinstance(item["ticket"], str) or not isinstance(item.get("answer", ""), str):
+            results.append({"recorded": False, "error": "ticket and answer must be strings"})
+            continue
+        ticket = read_ticket(username, item["ticket"])
+        if not ticket:
+            results.append({"ticket": item["ticket"], "recorded": False, "error": "invalid ticket"})
+            continue
+        # aynı partide aynı kelimenin ikinci bileti de kullanılmış sayılır (sayaç henüz artmadı)
+        if ticket["ing"] in levels or not ticket_unused(ticket, words):
+            results.append({"ing": ticket["ing"], "recorded": False, "error": "ticket already used"})
+            continue
+        ok = check_answer(item.get("answer", ""), ticket["answer"])
+        graded.append((ticket["ing"], ok))
+        levels[ticket["ing"]] = ticket
+        results.append({"ing": ticket["ing"], "correct": ok, "correct_answer": ticket["answer"], "recorded": True})
+
+    record_answers(username, graded, levels)
+    return jsonify(recorded=len(graded), results=results)
+
 
 # ----------------- ADMIN PANEL -----------------
+ADMIN_CSS = """
+body{font-family:system-ui;background:#0b1220;color:#eaf0ff;min-height:100vh;padding:24px}
+.card{max-width:900px;margin:0 auto;background:rgba(255,255,255,.06);border:1px solid rgba(255,255,255,.1);border-radius:18px;padding:18px}
+a{color:#6ee7ff;text-decoration:none;font-weight:700}
+th{color:#93a4c7;font-size:12px;text-align:left}
+.btn{padding:8px 10px;border-radius:12px;border:1px solid rgba(255,255,255,.14);background:rgba(255,255,255,.08);color:#eaf0ff;font-weight:700;cursor:pointer}
+.btn.danger{border-color:rgba(239,68,68,.35);background:rgba(239,68,68,.12)}
+.small{color:#93a4c7;font-size:13px}
+"""
+
+register_asset("admin.css", ADMIN_CSS)
+
 ADMIN_USERS_HTML = """
 <!doctype html><html lang="tr"><head>
 <meta charset="utf-8"><meta name="viewport" content="width=device-width,initial-scale=1">
 <title>Admin • Kullanıcılar</title>
+<link rel="stylesheet" href="{{ asset_url('admin.css') }}">
 <style>
-body{font-family:system-ui;background:#0b1220;color:#eaf0ff;min-height:100vh;padding:24px}
-.card{max-width:900px;margin:0 auto;background:rgba(255,255,255,.06);border:1px solid rgba(255,255,255,.1);border-radius:18px;padding:18px}
-a{color:#6ee7ff;text-decoration:none;font-weight:700}
 table{width:100%;border-collapse:separate;border-spacing:0 10px}
-th{color:#93a4c7;font-size:12px;text-align:left}
 td{background:rgba(0,0,0,.18);border:1px solid rgba(255,255,255,.08);padding:12px}
 tr td:first-child{border-radius:14px 0 0 14px}
 tr td:last-child{border-radius:0 14px 14px 0}
-.btn{padding:8px 10px;border-radius:12px;border:1px solid rgba(255,255,255,.14);background:rgba(255,255,255,.08);color:#eaf0ff;font-weight:700;cursor:pointer}
-.btn.danger{border-color:rgba(239,68,68,.35);background:rgba(239,68,68,.12)}
-.small{color:#93a4c7;font-size:13px}
 </style></head><body>
 <div class="card">
   <h2 style="margin:0 0 6px">Admin Panel • Kullanıcılar</h2>
   <div class="small">Giriş yapan: <b>{{admin}}</b> • <a href="/">Quiz</a> • <a href="/logout">Çıkış</a></div>
   <div style="margin-top:12px; display:flex; gap:10px; flex-wrap:wrap;">
     <a class="btn" href="/admin/export/users">Users JSON indir</a>
+    <a class="btn" href="/admin/export/all?format=ndjson">Tüm veri (NDJSON)</a>
+    <a class="btn" href="/admin/export/all?format=zip">Tüm veri (ZIP)</a>
+    <a class="btn" href="/admin/analytics">Analiz</a>
+    <a class="btn" href="/admin/profiles">Profil</a>
   </div>
 
   <table style="margin-top:14px">
@@ -907,6 +3150,8 @@ tr td:last-child{border-radius:0 14px 14px 0}
 </body></html>
 """
 
+register_template("admin_users", ADMIN_USERS_HTML)
+
 
 @app.route("/admin/users")
 @admin_required
@@ -921,24 +3166,709 @@ def admin_users():
                 "data_file": data_file_for(uname),
             }
         )
-    return render_template_string(ADMIN_USERS_HTML, users=rows, admin=current_user())
+    return render("admin_users", users=rows, admin=current_user())
 
 
 @app.route("/admin/export/users")
 @admin_required
 def admin_export_users():
+    etag = data_etag("users", storage.users_version())
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
     users = load_users()
 
     payload = json.dumps(users, ensure_ascii=False, indent=2)
-    return Response(
+    return with_etag(Response(
         payload,
         mimetype="application/json; charset=utf-8",
         headers={
             "Content-Disposition": 'attachment; filename="users_export.json"'
         }
+    ), etag)
+
+
+
+# ----------------- FULL EXPORT (streamed) -----------------
+# Tüm kullanıcılar + kelime verileri NDJSON (kullanıcı başına bir satır) veya anında yazılan ZIP olarak akıtılır.
+# Bellek kullanımı kullanıcı sayısından bağımsızdır (bir anda tek kullanıcının verisi).
+# Range/If-Range desteklenir: çıktı deterministiktir, ETag storage.data_version()'dan gelir;
+# Range isteğinde toplam boyut bir sayma geçişiyle bulunur.
+EXPORT_ZIP_DATE = (1980, 1, 1, 0, 0, 0)
+
+
+def iter_export_ndjson():
+    users = user_registry()
+    for username in sorted(users):
+        data = users[username]
+        line = {
+            "username": username,
+            "role": data.get("role", "user"),
+            "pw": data.get("pw", ""),
+            "data_file": data_file_for(username),
+            "words": storage.export_words(username),
+        }
+        yield (json.dumps(line, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+class _ZipSink(io.RawIOBase):
+    # zipfile'ın yazdığı baytları toplayıp generator'a devreder (seek edilemez akış)
+    def __init__(self):
+        self.chunks = []
+        self.pos = 0
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.chunks.append(bytes(b))
+        self.pos += len(b)
+        return len(b)
+
+    def tell(self):
+        return self.pos
+
+    def drain(self):
+        chunks, self.chunks = self.chunks, []
+        return b"".join(chunks)
+
+
+def iter_export_zip():
+    sink = _ZipSink()
+    users = user_registry()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        entries = [(USERS_FILE, lambda: users)]
+        entries += [(data_file_for(u), lambda u=u: storage.export_words(u)) for u in sorted(users)]
+        for name, load in entries:
+            info = zipfile.ZipInfo(name, date_time=EXPORT_ZIP_DATE)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with zf.open(info, "w") as dst:
+                dst.write(json.dumps(load(), ensure_ascii=False, indent=2).encode("utf-8"))
+            yield sink.drain()
+    yield sink.drain()
+
+
+EXPORT_FORMATS = {
+    "ndjson": (iter_export_ndjson, "application/x-ndjson", "kelimeweb_export.ndjson"),
+    "zip": (iter_export_zip, "application/zip", "kelimeweb_export.zip"),
+}
+
+
+def _parse_range(header: str | None):
+    # sadece tek aralık: "bytes=N-" veya "bytes=N-M"
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[6:].strip().partition("-")
+    try:
+        return int(first), int(last) if last else None
+    except ValueError:
+        return None
+
+
+def _slice_stream(chunks, start: int, end: int):
+    # [start, end] (dahil) aralığını üretir
+    pos = 0
+    for chunk in chunks:
+        nxt = pos + len(chunk)
+        if nxt > start and pos <= end:
+            yield chunk[max(start - pos, 0):end - pos + 1]
+        if nxt > end:
+            return
+        pos = nxt
+
+
+# ETag -> dışa aktarımın toplam uzunluğu (bu worker'da). Range/devam istekleri toplamı bilmek için
+# dışa aktarımı baştan üretmek zorunda kalmasın: tam indirmeler akarken sayar, sayım ETag başına bir kez yapılır.
+EXPORT_SIZE_CACHE = 16
+_export_sizes: OrderedDict = OrderedDict()
+_export_sizes_lock = threading.Lock()
+
+
+def _export_size_put(etag: str, total: int):
+    with _export_sizes_lock:
+        _export_sizes[etag] = total
+        _export_sizes.move_to_end(etag)
+        while len(_export_sizes) > EXPORT_SIZE_CACHE:
+            _export_sizes.popitem(last=False)
+
+
+def _export_size(etag: str, make_iter) -> int:
+    with _export_sizes_lock:
+        total = _export_sizes.get(etag)
+    if total is None:
+        total = sum(len(chunk) for chunk in make_iter())
+        _export_size_put(etag, total)
+    return total
+
+
+def _counting_stream(chunks, etag: str):
+    total = 0
+    for chunk in chunks:
+        total += len(chunk)
+        yield chunk
+    _export_size_put(etag, total)  # yarıda kesilen indirme sayılmaz
+
+
+@app.route("/admin/export/all")
+@admin_required
+def admin_export_all():
+    fmt = request.args.get("format", "ndjson")
+    if fmt not in EXPORT_FORMATS:
+        return "format must be ndjson or zip", 400
+    make_iter, mimetype, filename = EXPORT_FORMATS[fmt]
+    etag = f'"{fmt}-{storage.data_version()}"'
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+    }
+
+    rng = _parse_range(request.headers.get("Range"))
+    if_range = request.headers.get("If-Range")
+    if rng and (not if_range or if_range == etag):
+        total = _export_size(etag, make_iter)
+        start, end = rng[0], min(rng[1] if rng[1] is not None else total - 1, total - 1)
+        if start >= total or start > end:
+            return Response(status=416, headers={"Content-Range": f"bytes */{total}", **headers})
+        headers["Content-Range"] = f"bytes {start}-{end}/{total}"
+        headers["Content-Length"] = str(end - start + 1)
+        return Response(_slice_stream(make_iter(), start, end), status=206, mimetype=mimetype, headers=headers)
+
+    return Response(_counting_stream(make_iter(), etag), mimetype=mimetype, headers=headers)
+
+
+# ----------------- ANALYTICS (cross-user) -----------------
+# Kullanıcılar arası toplamlar analytics.json'da tutulur ve cevaplar işlendikçe artımlı güncellenir:
+#   words:  ing -> [d, y]     levels: seviye -> [d, y]     users: kullanıcı -> [son cevap ts, cevap sayısı]
+# Her worker cevap deltalarını bellekte biriktirip eşik/süre dolunca kilit altında dosyaya katlar;
+# panelin okuduğu özet (analytics_view.json) her katlamada yeniden üretilir, böylece panel sabit sürede açılır.
+# rebuild_analytics() tüm kullanıcıları tarayıp kaymayı düzeltir (panelden periyodik veya `flask rebuild-analytics`).
+ANALYTICS_FILE = os.environ.get("ANALYTICS_FILE", "analytics.json")
+ANALYTICS_VIEW_FILE = os.environ.get("ANALYTICS_VIEW_FILE", "analytics_view.json")
+ANALYTICS_LOCK_FILE = os.environ.get("ANALYTICS_LOCK_FILE", "analytics.lock")
+ANALYTICS_FLUSH_EVERY = int(os.environ.get("ANALYTICS_FLUSH_EVERY", "50"))
+ANALYTICS_FLUSH_SECONDS = int(os.environ.get("ANALYTICS_FLUSH_SECONDS", "10"))
+ANALYTICS_REBUILD_SECONDS = int(os.environ.get("ANALYTICS_REBUILD_SECONDS", str(24 * 3600)))
+ANALYTICS_REBUILD_TIMEOUT = 3600  # yarım kalmış bir rebuild işareti bu süreden sonra yok sayılır
+ANALYTICS_ACTIVE_DAYS = 7
+ANALYTICS_MIN_ATTEMPTS = 3
+ANALYTICS_TOP = 20
+
+_analytics_lock = threading.Lock()
+_analytics_rebuilding = threading.Event()
+_analytics_timer = None
+
+
+def _empty_analytics_delta():
+    # words/levels deltaları ham olay olarak tutulur: (ts, kullanıcı, ing, seviye, doğru mu).
+    # rebuild kullanıcının kalıcı sayaçlarını okuduktan önceki olayları katlamada atlayabilmek için gerekli.
+    return {"events": [], "users": {}, "since": time.time()}
+
+
+_analytics_pending = _empty_analytics_delta()
+
+
+def analytics_record(username: str, answers, words=None):
+    global _analytics_pending, _analytics_timer
+    if not answers:
+        return
+    now = time.time()
+    with _analytics_lock:
+        p = _analytics_pending
+        if not p["events"]:
+            p["since"] = now
+        for ing, ok, *_ in answers:
+            w = words.get(ing) if words is not None else None
+            level = (w.get("level", "A1") if w else "A1").upper()
+            p["events"].append((now, username, ing, level, 1 if ok else 0))
+        u = p["users"].setdefault(username, [0, 0])
+        u[0] = int(now)
+        u[1] += len(answers)
+        due = len(p["events"]) >= ANALYTICS_FLUSH_EVERY or now - p["since"] >= ANALYTICS_FLUSH_SECONDS
+        # boşta kalan worker'ın deltaları da ANALYTICS_FLUSH_SECONDS içinde katlansın
+        timer = _analytics_timer
+        if not due and (timer is None or not timer.is_alive()):
+            timer = _analytics_timer = threading.Timer(ANALYTICS_FLUSH_SECONDS, flush_analytics)
+            timer.daemon = True
+            timer.start()
+    if due:
+        flush_analytics()
+
+
+@contextmanager
+def _analytics_file_locked():
+    with open(ANALYTICS_LOCK_FILE, "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _read_json_file(path: str, default):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return default
+
+
+def _write_json_atomic(path: str, data):
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def _load_analytics():
+    data = _read_json_file(ANALYTICS_FILE, {})
+    for key in ("words", "levels", "users"):
+        data.setdefault(key, {})
+    data.setdefault("rebuilt_at", 0)
+    return data
+
+
+def _analytics_view(data):
+    now = int(time.time())
+    hardest = []
+    for ing, (d, y) in data["words"].items():
+        if d + y >= ANALYTICS_MIN_ATTEMPTS and y:
+            hardest.append({"ing": ing, "d": d, "y": y, "wrong_pct": int(y * 100 / (d + y))})
+    hardest.sort(key=lambda r: (r["wrong_pct"], r["y"]), reverse=True)
+
+    levels = []
+    for lvl in LEVELS:
+        d, y = data["levels"].get(lvl, [0, 0])
+        levels.append({"level": lvl, "d": d, "y": y, "pct": int(d * 100 / (d + y)) if d + y else 0})
+
+    cutoff = now - ANALYTICS_ACTIVE_DAYS * 86400
+    active = [
+        {"username": u, "last": last, "answers": n}
+        for u, (last, n) in data["users"].items()
+        if last >= cutoff
+    ]
+    active.sort(key=lambda r: r["last"], reverse=True)
+    return {
+        "hardest": hardest[:ANALYTICS_TOP],
+        "levels": levels,
+        "active_count": len(active),
+        "active": active[:ANALYTICS_TOP],
+        "updated_at": now,
+        "rebuilt_at": data.get("rebuilt_at", 0),
+    }
+
+
+def _save_analytics(data):
+    _write_json_atomic(ANALYTICS_FILE, data)
+    _write_json_atomic(ANALYTICS_VIEW_FILE, _analytics_view(data))
+
+
+def _fold_analytics_events(data, events):
+    # kullanıcının sayaçları son rebuild'de okunduktan önceki cevaplar zaten o taramada sayıldı
+    scanned = data.get("scanned", {})
+    for t, username, ing, level, ok in events:
+        if t < scanned.get(username, 0):
+            continue
+        for key, name in (("words", ing), ("levels", level)):
+            data[key].setdefault(name, [0, 0])[1 - ok] += 1
+
+
+def flush_analytics():
+    global _analytics_pending
+    with _analytics_lock:
+        pending, _analytics_pending = _analytics_pending, _empty_analytics_delta()
+    if not pending["users"]:
+        return
+    with _analytics_file_locked():
+        data = _load_analytics()
+        _fold_analytics_events(data, pending["events"])
+        if "rebuild" in data:
+            # süren rebuild taramanın sonunda sayaçları değiştirecek; bu olaylar orada yeniden katlanır
+            data["rebuild"]["events"].extend(pending["events"])
+        for username, (last, n) in pending["users"].items():
+            u = data["users"].setdefault(username, [0, 0])
+            u[0] = max(u[0], last)
+            u[1] += n
+        _save_analytics(data)
+
+
+def rebuild_analytics():
+    # tüm kullanıcıların kalıcı sayaçlarından words/levels yeniden hesaplanır (kayma düzeltme).
+    # Diğer worker'ların henüz katlanmamış deltaları taranan sayaçlarda zaten var: her kullanıcının
+    # okunduğu an "scanned"a yazılır ve katlamada o andan önceki olaylar atlanır. Tarama sürerken
+    # katlanan olaylar "rebuild" altında saklanır ve sonuçla birleştirilir.
+    flush_analytics()
+    with _analytics_file_locked():
+        data = _load_analytics()
+        started = data.get("rebuild", {}).get("started", 0)
+        if time.time() - started < ANALYTICS_REBUILD_TIMEOUT:
+            return  # başka bir worker tarıyor
+        data["rebuild"] = {"started": time.time(), "events": []}
+        _write_json_atomic(ANALYTICS_FILE, data)
+
+    catalog = load_catalog()
+    words, levels, scanned = {}, {}, {}
+    users = user_registry()
+    try:
+        for username in users:
+            scanned[username] = time.time()
+            for e in storage.export_words(username):
+                d, y = int(e.get("d", 0)), int(e.get("y", 0))
+                if not (d or y):
+                    continue
+                key = (e.get("ing", ""), e.get("tr", ""))
+                level = e.get("level") or (catalog[_catalog_keys[key]][2] if key in _catalog_keys else "A1")
+                for bucket, name in ((words, key[0]), (levels, level.upper())):
+                    c = bucket.setdefault(name, [0, 0])
+                    c[0] += d
+                    c[1] += y
+    except BaseException:
+        with _analytics_file_locked():
+            data = _load_analytics()
+            data.pop("rebuild", None)
+            _write_json_atomic(ANALYTICS_FILE, data)
+        raise
+
+    with _analytics_file_locked():
+        data = _load_analytics()
+        events = data.pop("rebuild", {}).get("events", [])
+        data["words"], data["levels"], data["scanned"] = words, levels, scanned
+        _fold_analytics_events(data, events)
+        data["users"] = {u: v for u, v in data["users"].items() if u in users}
+        data["rebuilt_at"] = int(time.time())
+        _save_analytics(data)
+
+
+def _rebuild_analytics_background():
+    if _analytics_rebuilding.is_set():
+        return
+    _analytics_rebuilding.set()
+
+    def run():
+        try:
+            rebuild_analytics()
+        finally:
+            _analytics_rebuilding.clear()
+
+    threading.Thread(target=run, name="analytics-rebuild", daemon=True).start()
+
+
+def analytics_view():
+    flush_analytics()
+    view = _read_json_file(ANALYTICS_VIEW_FILE, None)
+    if view is None:
+        rebuild_analytics()
+        view = _read_json_file(ANALYTICS_VIEW_FILE, {})
+    elif time.time() - view.get("rebuilt_at", 0) >= ANALYTICS_REBUILD_SECONDS:
+        _rebuild_analytics_background()
+    return view
+
+
+atexit.register(flush_analytics)
+
+
+@app.cli.command("rebuild-analytics")
+def rebuild_analytics_command():
+    rebuild_analytics()
+    click.echo(json.dumps(_read_json_file(ANALYTICS_VIEW_FILE, {}), ensure_ascii=False))
+
+
+ADMIN_ANALYTICS_HTML = """
+<!doctype html><html lang="tr"><head>
+<meta charset="utf-8"><meta name="viewport" content="width=device-width,initial-scale=1">
+<title>Admin • Analiz</title>
+<link rel="stylesheet" href="{{ asset_url('admin.css') }}">
+<style>
+.card{margin:0 auto 14px}
+table{width:100%;border-collapse:collapse;margin-top:10px}
+th,td{border-bottom:1px solid rgba(255,255,255,.08);padding:8px}
+</style></head><body>
+<div class="card">
+  <h2 style="margin:0 0 6px">Admin Panel • Analiz</h2>
+  <div class="small"><a href="/admin/users">Kullanıcılar</a> • Aktif kullanıcı ({{days}} gün): <b>{{view.active_count}}</b></div>
+</div>
+
+<div class="card">
+  <h3 style="margin:0">Seviyeye göre başarı</h3>
+  <table>
+    <thead><tr><th>Seviye</th><th>Doğru</th><th>Yanlış</th><th>Başarı</th></tr></thead>
+    <tbody>
+      {% for r in view.levels %}
+      <tr><td>{{r.level}}</td><td>{{r.d}}</td><td>{{r.y}}</td><td>%{{r.pct}}</td></tr>
+      {% endfor %}
+    </tbody>
+  </table>
+</div>
+
+<div class="card">
+  <h3 style="margin:0">En zor kelimeler</h3>
+  <table>
+    <thead><tr><th>İngilizce</th><th>Doğru</th><th>Yanlış</th><th>Yanlış oranı</th></tr></thead>
+    <tbody>
+      {% for r in view.hardest %}
+      <tr><td><b>{{r.ing}}</b></td><td>{{r.d}}</td><td>{{r.y}}</td><td>%{{r.wrong_pct}}</td></tr>
+      {% else %}
+      <tr><td colspan="4" class="small">Henüz yeterli veri yok.</td></tr>
+      {% endfor %}
+    </tbody>
+  </table>
+</div>
+
+<div class="card">
+  <h3 style="margin:0">Son aktif kullanıcılar</h3>
+  <table>
+    <thead><tr><th>Kullanıcı</th><th>Cevap</th><th>Son cevap</th></tr></thead>
+    <tbody>
+      {% for r in view.active %}
+      <tr><td>{{r.username}}</td><td>{{r.answers}}</td><td>{{r.last_text}}</td></tr>
+      {% endfor %}
+    </tbody>
+  </table>
+  <div class="small" style="margin-top:10px">Özet: {{updated}} • Tam yeniden hesaplama: {{rebuilt}}</div>
+</div>
+</body></html>
+"""
+
+register_template("admin_analytics", ADMIN_ANALYTICS_HTML)
+
+
+def _fmt_ts(ts) -> str:
+    return time.strftime("%Y-%m-%d %H:%M", time.localtime(ts)) if ts else "-"
+
+
+@app.route("/admin/analytics")
+@admin_required
+def admin_analytics():
+    view = analytics_view()
+    for r in view.get("active", []):
+        r["last_text"] = _fmt_ts(r["last"])
+    return render(
+        "admin_analytics",
+        view=view,
+        days=ANALYTICS_ACTIVE_DAYS,
+        updated=_fmt_ts(view.get("updated_at")),
+        rebuilt=_fmt_ts(view.get("rebuilt_at")),
+    )
+
+
+# ----------------- PROFILING (per request) -----------------
+# Örneklenen istekler cProfile ile sarılır; her biri PROFILE_DIR'a <stem>.prof (pstats) ve <stem>.json
+# (route, kullanıcı, kelime sayısı, süre, en pahalı fonksiyonlar) olarak yazılır, en yeni PROFILE_KEEP tutulur.
+# Ayarlar env ile başlar (PROFILE_SAMPLE_RATE=0 kapalı); admin panelden değiştirilince PROFILE_DIR/settings.json'a
+# yazılır ve tüm worker'lar dosyanın mtime'ı değişince yeniden okur.
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+PROFILE_KEEP = int(os.environ.get("PROFILE_KEEP", "200"))
+PROFILE_TOP = 15
+PROFILE_DEFAULTS = {
+    "rate": float(os.environ.get("PROFILE_SAMPLE_RATE", "0")),
+    "user": os.environ.get("PROFILE_USER", ""),  # boşsa tüm kullanıcılar
+    "route": os.environ.get("PROFILE_ROUTE", ""),  # boşsa tüm route'lar (örn. "/")
+}
+_profile_settings = {"key": None, "value": dict(PROFILE_DEFAULTS)}
+
+
+def _profile_settings_file():
+    return os.path.join(PROFILE_DIR, "settings.json")
+
+
+def profile_settings():
+    st = _stat_or_none(_profile_settings_file())
+    key = _stat_key(st)
+    if key != _profile_settings["key"]:
+        value = dict(PROFILE_DEFAULTS)
+        if st:
+            value.update(_read_json_file(_profile_settings_file(), {}))
+        _profile_settings.update(key=key, value=value)
+    return _profile_settings["value"]
+
+
+def save_profile_settings(rate: float, user: str, route: str):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    _write_json_atomic(_profile_settings_file(), {"rate": rate, "user": user, "route": route})
+
+
+def _should_profile() -> bool:
+    cfg = profile_settings()
+    if cfg["rate"] <= 0 or request.path.startswith(("/admin/profiles", "/metrics")):
+        return False
+    if cfg["user"] and cfg["user"] != current_user():
+        return False
+    route = request.url_rule.rule if request.url_rule else ""
+    if cfg["route"] and cfg["route"] != route:
+        return False
+    return random.random() < cfg["rate"]
+
+
+def _profile_top(prof):
+    stats = pstats.Stats(prof).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:PROFILE_TOP]
+    return [
+        {
+            "func": f"{os.path.basename(filename)}:{line}({func})",
+            "calls": nc,
+            "tottime": round(tt, 6),
+            "cumtime": round(ct, 6),
+        }
+        for (filename, line, func), (cc, nc, tt, ct, callers) in rows
+    ]
+
+
+def _rotate_profiles():
+    metas = sorted(name for name in os.listdir(PROFILE_DIR) if name.endswith(".json") and name != "settings.json")
+    for name in metas[: max(len(metas) - PROFILE_KEEP, 0)]:
+        stem = name[: -len(".json")]
+        for ext in (".json", ".prof"):
+            try:
+                os.remove(os.path.join(PROFILE_DIR, stem + ext))
+            except FileNotFoundError:
+                pass
+
+
+def _save_profile(prof, seconds: float, status: int):
+    route = request.url_rule.rule if request.url_rule else request.path
+    now = time.time()
+    # isim zamana göre sıralanır; rotasyon en eskiyi siler
+    stem = f"{int(now * 1000):013d}_{os.getpid()}_{hashlib.sha1(route.encode()).hexdigest()[:6]}"
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    prof.dump_stats(os.path.join(PROFILE_DIR, stem + ".prof"))
+    meta = {
+        "id": stem,
+        "ts": int(now),
+        "route": route,
+        "method": request.method,
+        "status": status,
+        "user": current_user() or "",
+        "vocab": g.get("vocab_size"),
+        "seconds": round(seconds, 6),
+        "top": _profile_top(prof),
+    }
+    _write_json_atomic(os.path.join(PROFILE_DIR, stem + ".json"), meta)
+    _rotate_profiles()
+
+
+@app.before_request
+def _profile_start():
+    if not _should_profile():
+        return
+    prof = cProfile.Profile()
+    try:
+        prof.enable()
+    except ValueError:
+        return  # bu thread'de başka bir profiler çalışıyor
+    g.profiler = prof
+    g.profile_t0 = time.perf_counter()
+
+
+@app.after_request
+def _profile_finish(resp):
+    prof = g.pop("profiler", None)
+    if prof is not None:
+        prof.disable()
+        _save_profile(prof, time.perf_counter() - g.profile_t0, resp.status_code)
+    return resp
+
+
+def list_profiles(limit: int = 50):
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    metas = []
+    for name in os.listdir(PROFILE_DIR):
+        if name.endswith(".json") and name != "settings.json":
+            meta = _read_json_file(os.path.join(PROFILE_DIR, name), None)
+            if meta:
+                metas.append(meta)
+    metas.sort(key=lambda m: m["seconds"], reverse=True)
+    return metas[:limit]
+
+
+ADMIN_PROFILES_HTML = """
+<!doctype html><html lang="tr"><head>
+<meta charset="utf-8"><meta name="viewport" content="width=device-width,initial-scale=1">
+<title>Admin • Profil</title>
+<link rel="stylesheet" href="{{ asset_url('admin.css') }}">
+<style>
+.card{max-width:1000px;margin:0 auto 14px}
+table{width:100%;border-collapse:collapse;margin-top:10px}
+th,td{border-bottom:1px solid rgba(255,255,255,.08);padding:6px 8px;vertical-align:top}
+input{padding:8px;border-radius:10px;border:1px solid rgba(255,255,255,.14);background:rgba(0,0,0,.2);color:#eaf0ff}
+code{font-size:12px}
+</style></head><body>
+<div class="card">
+  <h2 style="margin:0 0 6px">Admin Panel • Profil</h2>
+  <div class="small"><a href="/admin/users">Kullanıcılar</a> • Dizin: {{dir}} • En fazla {{keep}} kayıt</div>
+  <form method="post" style="margin-top:12px; display:flex; gap:10px; flex-wrap:wrap; align-items:center">
+    <label class="small">Örnekleme oranı <input name="rate" value="{{cfg.rate}}" size="5"></label>
+    <label class="small">Kullanıcı <input name="user" value="{{cfg.user}}" placeholder="hepsi" size="10"></label>
+    <label class="small">Route <input name="route" value="{{cfg.route}}" placeholder="hepsi" size="10"></label>
+    <button class="btn" type="submit">Kaydet</button>
+  </form>
+</div>
+
+{% for p in profiles %}
+<div class="card">
+  <div><b>{{ "%.1f"|format(p.seconds * 1000) }} ms</b> • {{p.method}} {{p.route}} ({{p.status}}) •
+    kullanıcı: <b>{{p.user or "-"}}</b> • kelime: {{p.vocab if p.vocab is not none else "-"}} •
+    <span class="small">{{p.when}}</span> • <a href="/admin/profiles/{{p.id}}.prof">.prof indir</a></div>
+  <table>
+    <thead><tr><th>Fonksiyon</th><th>Çağrı</th><th>tottime</th><th>cumtime</th></tr></thead>
+    <tbody>
+      {% for f in p.top %}
+      <tr><td><code>{{f.func}}</code></td><td>{{f.calls}}</td><td>{{f.tottime}}</td><td>{{f.cumtime}}</td></tr>
+      {% endfor %}
+    </tbody>
+  </table>
+</div>
+{% else %}
+<div class="card small">Henüz profil yok. Örnekleme oranını 0'dan büyük yap (ör. 0.1 = isteklerin %10'u).</div>
+{% endfor %}
+</body></html>
+"""
+
+register_template("admin_profiles", ADMIN_PROFILES_HTML)
+
+
+@app.route("/admin/profiles", methods=["GET", "POST"])
+@admin_required
+def admin_profiles():
+    if request.method == "POST":
+        try:
+            rate = min(max(float(request.form.get("rate", "0")), 0.0), 1.0)
+        except ValueError:
+            rate = 0.0
+        save_profile_settings(
+            rate,
+            request.form.get("user", "").strip().lower(),
+            request.form.get("route", "").strip(),
+        )
+        return redirect(url_for("admin_profiles"))
+
+    profiles = list_profiles()
+    for p in profiles:
+        p["when"] = _fmt_ts(p["ts"])
+    return render("admin_profiles", profiles=profiles, cfg=profile_settings(), dir=PROFILE_DIR, keep=PROFILE_KEEP)
+
+
+@app.route("/admin/profiles/<stem>.prof")
+@admin_required
+def admin_profile_download(stem):
+    path = os.path.join(PROFILE_DIR, os.path.basename(stem) + ".prof")
+    if not os.path.exists(path):
+        return "Profil bulunamadı.", 404
+    with open(path, "rb") as f:
+        data = f.read()
+    return Response(
+        data,
+        mimetype="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{os.path.basename(path)}"'},
     )
 
 
+@app.route("/admin/cache")
+@admin_required
+def admin_cache():
+    return jsonify(word_cache_info())
+
 
 @app.route("/admin/delete/<username>", methods=["POST"])
 @admin_required
@@ -947,26 +3877,18 @@ def admin_delete_user(username):
     if not username or username == current_user():
         return redirect(url_for("admin_users"))
 
-    users = load_users()
-    if username in users:
-        users.pop(username, None)
-        save_users(users)
-
-        df = data_file_for(username)
-        try:
-            if os.path.exists(df):
-                os.remove(df)
-        except Exception:
-            pass
+    if get_user(username):
+        delete_user(username)
 
     return redirect(url_for("admin_users"))
 
 
 # ----------------- STARTUP -----------------
-bootstrap_users()
-ensure_admin()
+bootstrap()
 
 if __name__ == "__main__":
+    # SIGTERM'de normal çıkış: atexit ile bekleyen write-behind cevapları ve metrikler yazılır
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
     # (Geliştirme sırasında) debug istersen:
     # app.run(host="0.0.0.0", port=int(os.environ.get("PORT", "5000")), debug=True)
     port = int(os.environ.get("PORT", "5000"))
@@ -0,0 +1,159 @@
+# Yük testi: N kullanıcı giriş yapar, / üzerinde soru cevaplar, /add ile kelime ekler, /stats açar.
+# Flask test client ile çalışır (ağ yok); kullanıcılar P sürece dağıtılır. Her kelime dağarcığı boyutu
+# için ayrı geçici dizin ve katalog kurulur, işlem türü başına throughput ve p50/p95/p99 raporlanır.
+#   python bench_load.py [--vocab 240,5000,50000] [--users 8] [--procs 4] [--ops 200] [--backend json|sqlite]
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import re
+import shutil
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+LEVELS = ["A1", "A2", "B1", "B2", "C1", "C2"]
+# işlem karışımı (ağırlık): çoğunluk cevap, arada kelime ekleme ve istatistik
+MIX = (("answer", 90), ("add", 5), ("stats", 5))
+PASSWORD = "bench1234"
+
+_TICKET = re.compile(r'name="ticket" value="([^"]*)"')
+
+
+def make_catalog(path: str, size: int):
+    # 240: depodaki gerçek katalog; daha büyük boyutlar gerçek katalog + sentetik kelimeler
+    with open(os.path.join(HERE, "kelimeler.json"), "r", encoding="utf-8") as f:
+        words = json.load(f)[:size]
+    for i in range(len(words), size):
+        words.append({"ing": f"word{i}", "tr": f"kelime{i}", "level": LEVELS[i % len(LEVELS)]})
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(words, f, ensure_ascii=False)
+
+
+def _import_app(workdir: str, backend: str):
+    os.chdir(workdir)
+    os.environ.update(
+        CATALOG_FILE=os.path.join(workdir, "kelimeler.json"),
+        STORAGE_BACKEND=backend,
+        SQLITE_PATH=os.path.join(workdir, "bench.db"),
+        METRICS_DIR=os.path.join(workdir, "metrics"),
+        # pool süreçleri daemon olduğundan hash havuzu açamaz; hash inline yapılır
+        HASH_WORKERS="0",
+        LOGIN_USER_PER_MIN="1000",
+        LOGIN_USER_BURST="1000",
+        LOGIN_IP_PER_MIN="100000",
+        LOGIN_IP_BURST="100000",
+    )
+    import app as kelimeweb
+
+    return kelimeweb
+
+
+def setup_users(workdir: str, backend: str, n: int):
+    from werkzeug.security import generate_password_hash
+
+    kelimeweb = _import_app(workdir, backend)
+    # kurulum hızlı olsun diye ucuz hash; giriş maliyeti ayrıca "login" satırında ölçülür
+    pw = generate_password_hash(PASSWORD, method="pbkdf2:sha256:1000")
+    users = kelimeweb.load_users()
+    for i in range(n):
+        users[f"bench{i}"] = {"pw": pw, "role": "user"}
+    kelimeweb.save_users(users)
+
+
+def run_users(workdir: str, backend: str, usernames, ops: int, seed: int):
+    kelimeweb = _import_app(workdir, backend)
+    rng = random.Random(seed)
+    kinds = [k for k, _ in MIX]
+    weights = [w for _, w in MIX]
+    samples = {"login": [], "answer": [], "add": [], "stats": []}
+
+    def timed(kind, fn):
+        t0 = time.perf_counter()
+        resp = fn()
+        resp.get_data()  # akışlı yanıtlar (/stats) tamamen tüketilince süre durur
+        samples[kind].append(time.perf_counter() - t0)
+        assert resp.status_code < 400, (kind, resp.status_code)
+        return resp
+
+    for u, username in enumerate(usernames):
+        client = kelimeweb.app.test_client()
+        client.environ_base["REMOTE_ADDR"] = f"10.0.{seed % 250}.{u % 250}"
+        timed("login", lambda: client.post("/login", data={"username": username, "password": PASSWORD}))
+        page = client.get("/").get_data(as_text=True)
+        for i in range(ops):
+            kind = rng.choices(kinds, weights)[0]
+            if kind == "answer":
+                ticket = _TICKET.search(page).group(1)
+                # beklenen cevap imzalı biletin içinde; sürücü doğru cevabı oradan okur
+                expected = kelimeweb.read_ticket(username, ticket)["answer"]
+                data = {"ticket": ticket, "answer": expected if rng.random() < 0.6 else "yanlış"}
+                page = timed("answer", lambda: client.post("/", data=data)).get_data(as_text=True)
+            elif kind == "add":
+                word = {"ing": f"{username}x{i}", "tr": f"ek{i}", "level": rng.choice(LEVELS)}
+                timed("add", lambda: client.post("/add", data=word))
+            else:
+                timed("stats", lambda: client.get("/stats"))
+    return samples
+
+
+def percentile(values, p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def bench_vocab(size: int, args):
+    workdir = tempfile.mkdtemp(prefix=f"kelimeweb_bench_{size}_")
+    try:
+        make_catalog(os.path.join(workdir, "kelimeler.json"), size)
+        ctx = multiprocessing.get_context("fork")
+        with ctx.Pool(1) as pool:
+            pool.apply(setup_users, (workdir, args.backend, args.users))
+
+        usernames = [f"bench{i}" for i in range(args.users)]
+        chunks = [usernames[i::args.procs] for i in range(args.procs)]
+        jobs = [(workdir, args.backend, chunk, args.ops, i) for i, chunk in enumerate(chunks) if chunk]
+        start = time.perf_counter()
+        with ctx.Pool(len(jobs)) as pool:
+            results = pool.starmap(run_users, jobs)
+        wall = time.perf_counter() - start
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    merged = {}
+    for samples in results:
+        for kind, values in samples.items():
+            merged.setdefault(kind, []).extend(values)
+
+    total = sum(len(v) for v in merged.values())
+    print(f"\nvocab={size} backend={args.backend} users={args.users} procs={len(jobs)} "
+          f"wall={wall:.2f}s total={total / wall:.1f} req/s")
+    print(f"{'op':<8} {'count':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for kind, values in merged.items():
+        if not values:
+            continue
+        print(f"{kind:<8} {len(values):>7} {len(values) / wall:>9.1f} "
+              f"{percentile(values, 50) * 1e3:>9.2f} {percentile(values, 95) * 1e3:>9.2f} "
+              f"{percentile(values, 99) * 1e3:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vocab", default="240,5000,50000", help="virgülle ayrılmış katalog boyutları")
+    parser.add_argument("--users", type=int, default=8, help="simüle edilen kullanıcı sayısı")
+    parser.add_argument("--procs", type=int, default=4, help="yükü üreten süreç sayısı")
+    parser.add_argument("--ops", type=int, default=200, help="kullanıcı başına işlem sayısı")
+    parser.add_argument("--backend", default="json", choices=["json", "sqlite"])
+    args = parser.parse_args()
+
+    for size in (int(s) for s in args.vocab.split(",") if s.strip()):
+        bench_vocab(size, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# Kelime başına bellek: eski dict kayıtları vs __slots__'lı Word kayıtları (intern edilmiş str, seviye enum'u).
+# Her kullanıcı için katalog + overlay (cevaplanmış kelimeler) birleştirilir, tracemalloc ile ölçülür.
+# Varsayılan 1000 kullanıcı x 5000 kelime; --sample kadar kullanıcı gerçekten kurulur, gerisi orantılanır.
+#   python bench_memory.py [--users 1000] [--words 5000] [--sample 20] [--answered 0.3]
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+LEVELS = ["A1", "A2", "B1", "B2", "C1", "C2"]
+
+
+def make_catalog(path: str, size: int):
+    with open(os.path.join(HERE, "kelimeler.json"), "r", encoding="utf-8") as f:
+        words = json.load(f)[:size]
+    for i in range(len(words), size):
+        words.append({"ing": f"word{i}", "tr": f"kelime{i}", "level": LEVELS[i % len(LEVELS)]})
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(words, f, ensure_ascii=False)
+
+
+def make_overlay(catalog, answered: float, custom: int, rng):
+    # diskten okunmuş gibi: her kullanıcının overlay'i kendi str nesneleriyle gelir
+    now = int(time.time())
+    overlay = []
+    for ing, tr, level in rng.sample(catalog, int(len(catalog) * answered)):
+        overlay.append(json.loads(json.dumps({
+            "ing": ing, "tr": tr, "d": rng.randrange(20), "y": rng.randrange(10),
+            "box": rng.randrange(6), "due": now + rng.randrange(86400 * 30),
+        })))
+    for i in range(custom):
+        overlay.append({"ing": f"custom{i}", "tr": f"özel{i}", "level": rng.choice(LEVELS), "d": 0, "y": 0})
+    return overlay
+
+
+def as_dicts(words):
+    # değişiklik öncesi temsil: kelime başına dict
+    out = []
+    for w in words:
+        d = {"ing": w["ing"], "tr": w["tr"], "level": w["level"], "d": w["d"], "y": w["y"]}
+        if w.get("box") is not None or w.get("due") is not None:
+            d["box"], d["due"] = w.get("box", 0), w.get("due", 0)
+        out.append(d)
+    return out
+
+
+def measure(build, n: int):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [build(i) for i in range(n)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1000, help="raporlanan kullanıcı sayısı")
+    parser.add_argument("--words", type=int, default=5000, help="katalog boyutu (kullanıcı başına kelime)")
+    parser.add_argument("--sample", type=int, default=20, help="gerçekten kurulan kullanıcı sayısı")
+    parser.add_argument("--answered", type=float, default=0.3, help="cevaplanmış kelime oranı")
+    parser.add_argument("--custom", type=int, default=50, help="kullanıcı başına eklenmiş kelime")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="kelimeweb_mem_")
+    try:
+        make_catalog(os.path.join(workdir, "kelimeler.json"), args.words)
+        os.chdir(workdir)
+        os.environ["CATALOG_FILE"] = os.path.join(workdir, "kelimeler.json")
+        sys.path.insert(0, HERE)
+        import app as kelimeweb
+
+        catalog = kelimeweb.load_catalog()
+        rng = random.Random(1)
+        overlays = [make_overlay(catalog, args.answered, args.custom, rng) for _ in range(args.sample)]
+        merged = [kelimeweb.merge_catalog(o) for o in overlays]
+        per_user = len(merged[0])
+
+        rows = [
+            ("kayıtlar (dict)", measure(lambda i: as_dicts(merged[i]), args.sample)),
+            ("kayıtlar (Word)", measure(lambda i: kelimeweb.merge_catalog(overlays[i]).words, args.sample)),
+            ("WordSet (dict)", measure(lambda i: kelimeweb.WordSet(as_dicts(merged[i])), args.sample)),
+            ("WordSet (Word)", measure(lambda i: kelimeweb.merge_catalog(overlays[i]), args.sample)),
+        ]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    total_words = args.users * per_user
+    print(f"{args.sample} kullanıcı ölçüldü, {per_user} kelime/kullanıcı -> {args.users} kullanıcıya orantılandı")
+    print(f"{'temsil':<18} {'byte/kelime':>12} {f'{args.users} kullanıcı':>16}")
+    for name, used in rows:
+        per_word = used / (args.sample * per_user)
+        print(f"{name:<18} {per_word:>12.1f} {per_word * total_words / 2**20:>13.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
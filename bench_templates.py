@@ -0,0 +1,62 @@
+# Şablon render maliyeti: render_template_string (her çağrıda derleme) vs derlenmiş şablon kaydı.
+#   python bench_templates.py [-n 2000]
+from __future__ import annotations
+
+import argparse
+import time
+
+from flask import render_template_string
+
+import app as kelimeweb
+
+
+def quiz_context():
+    word = {"ing": "apple", "tr": "elma", "level": "A1", "d": 0, "y": 0}
+    return dict(
+        question="apple → Türkçe?",
+        word=type("obj", (object,), word),
+        wrong=True,
+        right=False,
+        correct="elma",
+        direction="EN_TR",
+        ticket="WyJhcHBsZSIsIkVOX1RSIiwiZWxtYSIsIkExIl0.aAAAAA.signature",
+        level="A1",
+        user="ali",
+    )
+
+
+CASES = [
+    ("quiz", kelimeweb.HTML, quiz_context),
+    ("login", kelimeweb.LOGIN_HTML, lambda: {"error": "Kullanıcı adı veya şifre yanlış."}),
+    ("admin_users", kelimeweb.ADMIN_USERS_HTML, lambda: {
+        "admin": "soner",
+        "users": [{"username": f"u{i}", "role": "user", "data_file": f"kelimeler_u{i}.json"} for i in range(50)],
+    }),
+]
+
+
+def timed(fn, n: int) -> float:
+    fn()  # ısınma
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=2000, help="şablon başına render sayısı")
+    args = parser.parse_args()
+
+    print(f"{'template':<12} {'from_string':>14} {'registry':>14} {'speedup':>9}")
+    with kelimeweb.app.test_request_context():
+        for name, source, make_ctx in CASES:
+            ctx = make_ctx()
+            assert render_template_string(source, **ctx) == kelimeweb.render(name, **ctx)
+            before = timed(lambda: render_template_string(source, **ctx), args.n)
+            after = timed(lambda: kelimeweb.render(name, **ctx), args.n)
+            print(f"{name:<12} {before * 1e6:>11.1f} µs {after * 1e6:>11.1f} µs {before / after:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+# gunicorn varsayılan olarak çalışma dizinindeki bu dosyayı okur: `gunicorn app:app`
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+
+# app master'da bir kez import edilir: bootstrap (users.json / admin şifresi) deploy başına
+# bir kez çalışır, worker'lar fork ile devralır ve açılışta hash hesaplamaz.
+preload_app = True
+
+
+def on_starting(server):
+    # /metrics worker dosyalarını toplar; önceki deploy'un sayaçları yeni sürece karışmasın
+    import shutil
+
+    metrics_dir = os.environ.get("METRICS_DIR") or os.environ.get("PROMETHEUS_MULTIPROC_DIR") or "metrics"
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+def worker_exit(server, worker):
+    # SIGTERM/yeniden başlatmada worker kapanırken bellekte bekleyen cevaplar (WRITE_BEHIND_SECONDS) yazılır
+    import sys
+
+    app_module = sys.modules.get("app")
+    if app_module is not None:
+        app_module.flush_write_behind()
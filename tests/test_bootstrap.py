@@ -0,0 +1,41 @@
+# Aynı users.json ile ikinci açılış hash'i yalnızca admin şifresini doğrulamak için hesaplamalı, hiç yazmamalı.
+#   python -m pytest -q tests
+import importlib
+import os
+import shutil
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def import_app(tmp_path, monkeypatch):
+    shutil.copy(os.path.join(ROOT, "kelimeler.json"), tmp_path)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("CATALOG_FILE", str(tmp_path / "kelimeler.json"))
+    monkeypatch.setenv("METRICS_DIR", str(tmp_path / "metrics"))
+    monkeypatch.setenv("ADMIN_USER", "boss")
+    monkeypatch.setenv("ADMIN_PASS", "gizli-sifre")
+    monkeypatch.syspath_prepend(ROOT)
+
+    def load():
+        sys.modules.pop("app", None)
+        return importlib.import_module("app")
+
+    yield load
+    sys.modules.pop("app", None)
+
+
+def test_second_bootstrap_does_not_rehash_or_write(import_app, tmp_path):
+    first = import_app()
+    assert first.STARTUP_STATS["writes"] == 2  # varsayılan kullanıcılar + admin
+    users_mtime = os.stat(tmp_path / "users.json").st_mtime_ns
+
+    second = import_app()
+    assert second is not first
+    assert second.STARTUP_STATS["hashes"] == 1
+    assert second.STARTUP_STATS["writes"] == 0
+    assert os.stat(tmp_path / "users.json").st_mtime_ns == users_mtime
+    assert second.get_user("boss")["role"] == "admin"
@@ -0,0 +1,106 @@
+# Write-behind bekleyen cevaplar compaction / snapshot yazımından sonra diske bir kez girmeli.
+#   python -m pytest -q tests
+import importlib
+import os
+import shutil
+import sys
+import threading
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def kelimeweb(tmp_path, monkeypatch):
+    shutil.copy(os.path.join(ROOT, "kelimeler.json"), tmp_path)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("CATALOG_FILE", str(tmp_path / "kelimeler.json"))
+    monkeypatch.setenv("METRICS_DIR", str(tmp_path / "metrics"))
+    monkeypatch.setenv("WRITE_BEHIND_SECONDS", "3600")
+    monkeypatch.syspath_prepend(ROOT)
+    sys.modules.pop("app", None)
+    module = importlib.import_module("app")
+    yield module
+    # atexit kancaları depo dizininde çalışmasın diye bekleyenler burada yazılır
+    module.storage.flush_all()
+    module.flush_analytics()
+    sys.modules.pop("app", None)
+
+
+def cold_counts(kelimeweb, username, ing):
+    _, words, _ = kelimeweb._read_words(username)
+    w = words.get(ing)
+    return w["d"], w["y"]
+
+
+def test_idle_compaction_does_not_double_count_pending(kelimeweb):
+    storage = kelimeweb.storage
+    # başka bir worker'ın journal'a yazdığı cevaplar
+    storage.backend.record_answers("ali", [("apple", True), ("apple", False)])
+    storage.load_words("ali")
+
+    kelimeweb.record_answers("ali", [("apple", True)] * 3)
+    assert storage.load_words("ali").get("apple")["d"] == 4
+
+    kelimeweb.compact_journal("ali")
+    storage.flush_all()
+
+    assert storage.load_words("ali").get("apple")["d"] == 4
+    assert cold_counts(kelimeweb, "ali", "apple") == (4, 1)
+
+
+def test_threshold_compaction_during_flush(kelimeweb, monkeypatch):
+    monkeypatch.setattr(kelimeweb, "JOURNAL_COMPACT_BYTES", 0)
+    storage = kelimeweb.storage
+    storage.backend.record_answers("ali", [("apple", True)])
+    storage.load_words("ali")
+
+    kelimeweb.record_answers("ali", [("apple", True)] * 3)
+    storage.flush_all()
+
+    assert storage.load_words("ali").get("apple")["d"] == 4
+    assert cold_counts(kelimeweb, "ali", "apple") == (4, 0)
+
+
+def test_save_words_with_pending_answers(kelimeweb):
+    storage = kelimeweb.storage
+    words = storage.load_words("ali")
+    kelimeweb.record_answers("ali", [("apple", True)] * 3)
+
+    words.append({"ing": "moon", "tr": "ay", "level": "B1", "d": 0, "y": 0})
+    storage.save_words("ali", words)
+    storage.flush_all()
+
+    assert storage.load_words("ali").get("apple")["d"] == 3
+    assert cold_counts(kelimeweb, "ali", "apple") == (3, 0)
+
+
+def test_save_words_waits_for_running_flush(kelimeweb, monkeypatch):
+    storage = kelimeweb.storage
+    kelimeweb.record_answers("ali", [("apple", True)] * 3)
+    assert storage.load_words("ali").get("apple")["d"] == 3  # bekleyenler cache'teki nesneye uygulandı
+
+    # flush cevapları aldıktan sonra, journal'a yazmadan önce başka bir thread kelime ekler
+    backend_record = storage.backend.record_answers
+    adders = []
+
+    def add_word():
+        words = storage.load_words("ali")
+        words.append({"ing": "moon", "tr": "ay", "level": "B1", "d": 0, "y": 0})
+        storage.save_words("ali", words)
+
+    def record_during_add(username, answers, applied=None):
+        t = threading.Thread(target=add_word)
+        t.start()
+        t.join(0.2)  # save_words süren flush'ı beklemeli; beklemezse bu sürede snapshot'ı yazar
+        adders.append(t)
+        backend_record(username, answers, applied=applied)
+
+    monkeypatch.setattr(storage.backend, "record_answers", record_during_add)
+    storage.flush_user("ali")
+    adders[0].join()
+
+    assert storage.load_words("ali").get("apple")["d"] == 3
+    assert cold_counts(kelimeweb, "ali", "apple") == (3, 0)
+    assert cold_counts(kelimeweb, "ali", "moon") == (0, 0)